@@ -6,6 +6,15 @@ set -e
 echo "🧪 Running OmniDoc Tests..."
 echo "================================"
 
+# 并行运行 (pytest-xdist)：保留两个核心给系统，按文件分发以共享模块级 fixture
+# 未安装 pytest-xdist（dev 依赖）时退回串行运行
+CORES=$(nproc 2>/dev/null || sysctl -n hw.ncpu)
+WORKERS=$(( CORES > 2 ? CORES - 2 : 1 ))
+PARALLEL_ARGS=()
+if uv run python -c "import xdist" >/dev/null 2>&1; then
+    PARALLEL_ARGS=(-n "$WORKERS" --dist=loadfile)
+fi
+
 # 运行不需要数据库的单元测试
 echo ""
 echo "📦 Running unit tests (excluding database-dependent tests)..."
@@ -13,7 +22,7 @@ uv run pytest tests/unit/test_cross_referencer.py \
            tests/unit/test_error_handler.py \
            tests/unit/test_parallel_executor.py \
            tests/unit/test_rate_limiter.py \
-           -v --tb=short
+           -v --tb=short "${PARALLEL_ARGS[@]}"
 
 echo ""
 echo "📦 Running API tests..."
@@ -22,7 +31,7 @@ uv run pytest tests/test_api.py \
            tests/test_health.py \
            tests/test_monitoring.py \
            tests/test_websocket.py \
-           -v --tb=short
+           -v --tb=short "${PARALLEL_ARGS[@]}"
 
 echo ""
 echo "✅ Tests completed!"
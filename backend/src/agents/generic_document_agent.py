@@ -371,23 +371,15 @@ class GenericDocumentAgent(BaseAgent):
         # Save to database if context_manager is available
         if project_id and self.context_manager:
             try:
-                from src.context.shared_context import AgentType, DocumentStatus, AgentOutput
-                # Try to map document_id to AgentType
-                agent_type = None
-                try:
-                    agent_type = AgentType(self.definition.id)
-                except ValueError:
-                    # Not a standard AgentType - use GENERIC_DOCUMENT as fallback
-                    # This allows us to save any document type to the database
-                    logger.debug(f"Document {self.definition.id} not in AgentType enum, using GENERIC_DOCUMENT fallback")
-                    # Use a generic agent type that exists in the enum
-                    # We'll use document_type to identify the actual document
-                    try:
-                        # Try to use a generic type that makes sense
-                        agent_type = AgentType.TECHNICAL_DOCUMENTATION  # Generic fallback
-                    except:
-                        # Last resort - use any available type
-                        agent_type = list(AgentType)[0]  # Use first available type
+                from src.context.shared_context import AGENT_TYPES_BY_VALUE, AgentType, DocumentStatus, AgentOutput
+                # Map document_id to AgentType
+                agent_type = AGENT_TYPES_BY_VALUE.get(self.definition.id)
+                if agent_type is None:
+                    # Not a standard AgentType - use a generic type as fallback
+                    # This allows us to save any document type to the database;
+                    # document_type identifies the actual document
+                    logger.debug(f"Document {self.definition.id} not in AgentType enum, using TECHNICAL_DOCUMENTATION fallback")
+                    agent_type = AgentType.TECHNICAL_DOCUMENTATION
                 
                 # Always save to database - document_type identifies the actual document
                 output = AgentOutput(
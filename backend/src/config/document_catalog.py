@@ -105,10 +105,11 @@ def _catalog_path() -> Path:
 
 # Cache at module level to avoid reloading on every call
 _document_definitions_cache: Optional[Dict[str, DocumentDefinition]] = None
+_catalog_metadata_cache: Optional[Dict[str, Optional[str]]] = None
 
 def load_document_definitions() -> Dict[str, DocumentDefinition]:
     """Load and cache document definitions keyed by ID."""
-    global _document_definitions_cache
+    global _document_definitions_cache, _catalog_metadata_cache
     
     # Return cached version if available
     if _document_definitions_cache is not None:
@@ -199,18 +200,44 @@ def load_document_definitions() -> Dict[str, DocumentDefinition]:
         )
 
     # Cache the result
+    _catalog_metadata_cache = {
+        "generated_at": payload.get("generated_at"),
+        "source": payload.get("source"),
+    }
     _document_definitions_cache = definitions
     return definitions
 
 
+def get_catalog_metadata() -> Dict[str, Optional[str]]:
+    """Return the catalog's generated_at and source fields, cached with the definitions."""
+    if _catalog_metadata_cache is None:
+        load_document_definitions()
+    return _catalog_metadata_cache or {"generated_at": None, "source": None}
+
+
 def get_document_by_id(document_id: str) -> Optional[DocumentDefinition]:
     """Return a single document definition, if present."""
     return load_document_definitions().get(document_id)
 
 
+_document_names_cache: Optional[Dict[str, str]] = None
+
+def get_document_names() -> Dict[str, str]:
+    """Return a cached mapping of document ID to display name."""
+    global _document_names_cache
+    if _document_names_cache is None:
+        _document_names_cache = {
+            doc_id: definition.name for doc_id, definition in load_document_definitions().items()
+        }
+    return _document_names_cache
+
+
 def reload_catalog() -> None:
     """Clear the cached definitions (useful for tests or when the file changes)."""
-    load_document_definitions.cache_clear()  # type: ignore[attr-defined]
+    global _document_definitions_cache, _catalog_metadata_cache, _document_names_cache
+    _document_definitions_cache = None
+    _catalog_metadata_cache = None
+    _document_names_cache = None
     _load_quality_rules_dependencies.cache_clear()  # type: ignore[attr-defined]
 
 
@@ -5,14 +5,15 @@ Manages shared context database for agent collaboration
 import os
 import json
 import threading
+import time
 # Path removed - content is stored in database, not files
-from typing import Optional, Dict, List, Any
+from typing import Optional, Dict, Iterator, List, Any
 from datetime import datetime
 from contextlib import contextmanager
 
 import psycopg2
 from psycopg2 import pool
-from psycopg2.extras import RealDictCursor
+from psycopg2.extras import RealDictCursor, execute_values
 
 from src.context.shared_context import (
     SharedContext,
@@ -22,6 +23,7 @@ from src.context.shared_context import (
     AgentType,
     DocumentStatus
 )
+from src.utils.cache import invalidate_project_responses
 from src.utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -30,7 +32,8 @@ logger = get_logger(__name__)
 class ContextManager:
     """Manages shared context in PostgreSQL database"""
     
-    def __init__(self, db_url: Optional[str] = None, min_conn: int = 1, max_conn: int = 10):
+    def __init__(self, db_url: Optional[str] = None, min_conn: int = 1, max_conn: int = 10,
+                 pool_timeout: float = 10.0):
         """
         Initialize context manager with connection pooling
         
@@ -39,6 +42,7 @@ class ContextManager:
                    If None, reads from DATABASE_URL environment variable
             min_conn: Minimum number of connections in pool
             max_conn: Maximum number of connections in pool
+            pool_timeout: Seconds to wait for a free pooled connection before failing
         """
         if db_url is None:
             db_url = os.getenv("DATABASE_URL")
@@ -52,6 +56,11 @@ class ContextManager:
         self._lock = threading.Lock()
         self._min_conn = min_conn
         self._max_conn = max_conn
+        self._pool_timeout = pool_timeout
+        # Signalled whenever a pooled connection is returned or discarded; request
+        # handlers read from worker threads, so more callers than max_conn can ask
+        # for a connection at once and wait here instead of failing
+        self._pool_available = threading.Condition()
         
         # Connection statistics for monitoring
         self._connection_stats = {
@@ -92,7 +101,7 @@ class ContextManager:
                     self._connection_stats["total_created"] += 1
                     self._connection_stats["active_connections"] += 1
                 else:
-                    conn = self._connection_pool.getconn()
+                    conn = self._getconn()
                     self._connection_stats["pool_gets"] += 1
                     self._connection_stats["active_connections"] += 1
                 
@@ -108,8 +117,9 @@ class ContextManager:
                             self._connection_pool.putconn(conn, close=True)
                         except Exception:
                             pass
+                        self._notify_pool_available()
                         # Get replacement connection from pool
-                        conn = self._connection_pool.getconn()
+                        conn = self._getconn()
                         # Increment statistics for the new connection from pool
                         self._connection_stats["pool_gets"] += 1
                         self._connection_stats["active_connections"] += 1
@@ -135,7 +145,6 @@ class ContextManager:
                         f"Database connection failed (attempt {attempt + 1}/{max_retries}): {e}. "
                         f"Retrying..."
                     )
-                    import time
                     time.sleep(0.5 * (attempt + 1))  # Exponential backoff
                     continue
                 else:
@@ -146,9 +155,31 @@ class ContextManager:
                 logger.error(f"Unexpected error getting database connection: {e}")
                 raise
     
+    def _getconn(self):
+        """
+        Take a connection from the pool, waiting up to pool_timeout for one to free up
+        
+        ThreadedConnectionPool raises PoolError as soon as it is exhausted; this
+        waits for _put_connection to hand a connection back instead.
+        """
+        deadline = time.monotonic() + self._pool_timeout
+        with self._pool_available:
+            while True:
+                try:
+                    return self._connection_pool.getconn()
+                except pool.PoolError:
+                    remaining = deadline - time.monotonic()
+                    if self._connection_pool.closed or remaining <= 0:
+                        raise
+                    self._pool_available.wait(remaining)
+    
+    def _notify_pool_available(self):
+        """Wake one caller waiting in _getconn"""
+        with self._pool_available:
+            self._pool_available.notify()
+    
     def _check_connection_pool_health(self):
         """Check connection pool health and log warnings if needed"""
-        import time
         current_time = time.time()
         
         # Only warn once per minute to avoid log spam
@@ -183,12 +214,25 @@ class ContextManager:
         """Return a connection to the pool with health check and monitoring"""
         if conn is None:
             return
-        
+        try:
+            self._return_connection(conn)
+        finally:
+            if self._connection_pool is not None:
+                self._notify_pool_available()
+    
+    def _return_connection(self, conn):
+        """Hand a connection back to the pool, or close it if it is no longer usable"""
         # Check if connection is still valid before returning to pool
         if conn.closed:
             logger.debug("Connection is closed, not returning to pool")
             self._connection_stats["total_closed"] += 1
             self._connection_stats["active_connections"] = max(0, self._connection_stats["active_connections"] - 1)
+            if self._connection_pool is not None:
+                # Free its slot in the pool; a closed connection is discarded
+                try:
+                    self._connection_pool.putconn(conn, close=True)
+                except Exception:
+                    pass
             return
         
         if self._connection_pool is not None:
@@ -204,7 +248,8 @@ class ContextManager:
                 # Connection is bad, close it instead of returning to pool
                 logger.warning(f"Connection is invalid, closing instead of returning to pool: {e}")
                 try:
-                    conn.close()
+                    # close=True also frees the connection's slot in the pool
+                    self._connection_pool.putconn(conn, close=True)
                     self._connection_stats["total_closed"] += 1
                     self._connection_stats["active_connections"] = max(0, self._connection_stats["active_connections"] - 1)
                 except Exception:
@@ -303,7 +348,6 @@ class ContextManager:
                         f"Database connection error (attempt {attempt + 1}/{max_retries}): {e}. "
                         f"Retrying with new connection..."
                     )
-                    import time
                     time.sleep(0.5 * (attempt + 1))  # Exponential backoff
                     conn = None
                     cursor = None
@@ -328,12 +372,9 @@ class ContextManager:
                         pass
                 if conn:
                     try:
-                        # Only return to pool if connection is still valid
-                        if not conn.closed:
-                            self._put_connection(conn)
-                        else:
-                            # Connection is closed, don't return to pool
-                            logger.debug("Connection was closed, not returning to pool")
+                        # Closed connections are discarded by _put_connection, which
+                        # still frees their slot in the pool
+                        self._put_connection(conn)
                     except Exception as e:
                         logger.warning(f"Error returning connection to pool: {e}")
                         try:
@@ -430,12 +471,12 @@ class ContextManager:
                     completed_at TIMESTAMP,
                     failed_at TIMESTAMP,
                     error TEXT,
-                    completed_agents TEXT,  -- JSON array
-                    results TEXT,  -- JSON object (serialized results)
+                    completed_agents JSONB,  -- JSON array
+                    results JSONB,  -- JSON object (serialized results)
                     phase1_approved INTEGER DEFAULT 0,  -- 0 = pending, 1 = approved, 2 = rejected
                     phase1_approved_at TIMESTAMP,  -- Timestamp when Phase 1 was approved
                     phase1_approval_notes TEXT,  -- User notes/comments during approval
-                    selected_documents TEXT,
+                    selected_documents JSONB,
                     FOREIGN KEY (project_id) REFERENCES projects(project_id) ON DELETE CASCADE
                 )
             """)
@@ -447,9 +488,78 @@ class ContextManager:
                 WHERE table_name='project_status' AND column_name='selected_documents'
             """)
             if cursor.fetchone() is None:
-                cursor.execute("ALTER TABLE project_status ADD COLUMN selected_documents TEXT")
+                cursor.execute("ALTER TABLE project_status ADD COLUMN selected_documents JSONB")
             
             conn.commit()
+            
+            # Generated files of a project, one row per document, so the documents
+            # endpoint can page with LIMIT/OFFSET instead of loading results.files.
+            # position is the explicit page order (generation order); JSONB does not
+            # keep the key order of results.files
+            cursor.execute("SELECT to_regclass('project_files')")
+            project_files_exists = cursor.fetchone()[0] is not None
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS project_files (
+                    project_id VARCHAR(255) NOT NULL,
+                    doc_id VARCHAR(255) NOT NULL,
+                    position INTEGER NOT NULL,
+                    file_path TEXT,
+                    PRIMARY KEY (project_id, doc_id),
+                    FOREIGN KEY (project_id) REFERENCES projects(project_id) ON DELETE CASCADE
+                )
+            """)
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_project_files_position
+                ON project_files (project_id, position)
+            """)
+
+            # One-time backfill of the projects generated before project_files
+            # existed; later writes keep it in sync (see update_project_status).
+            # It runs before the JSONB migration below and reads results as json,
+            # which keeps the stored key order, so positions follow generation order
+            if not project_files_exists:
+                cursor.execute("""
+                    INSERT INTO project_files (project_id, doc_id, position, file_path)
+                    SELECT ps.project_id, f.key, f.ordinality - 1,
+                           CASE json_typeof(f.value)
+                               WHEN 'object' THEN f.value->>'path'
+                               WHEN 'string' THEN f.value #>> '{}'
+                           END
+                    FROM (
+                        SELECT project_id, NULLIF(results::text, '')::json -> 'files' AS files
+                        FROM project_status
+                    ) ps
+                    CROSS JOIN LATERAL json_each(
+                        CASE WHEN json_typeof(ps.files) = 'object' THEN ps.files ELSE '{}'::json END
+                    ) WITH ORDINALITY AS f(key, value, ordinality)
+                """)
+            conn.commit()
+
+            # Migrate JSON columns created as TEXT by older schemas to JSONB, so
+            # psycopg2 returns them already parsed. Queries rely on JSONB operators,
+            # so a failed migration stops startup instead of failing later requests
+            for column in ("completed_agents", "results", "selected_documents"):
+                cursor.execute("""
+                    SELECT data_type
+                    FROM information_schema.columns
+                    WHERE table_name='project_status' AND column_name=%s
+                """, (column,))
+                row = cursor.fetchone()
+                if not row or row[0] != "text":
+                    continue
+                try:
+                    cursor.execute(
+                        f"ALTER TABLE project_status ALTER COLUMN {column} TYPE JSONB "
+                        f"USING NULLIF({column}, '')::jsonb"
+                    )
+                    conn.commit()
+                except psycopg2.Error as e:
+                    conn.rollback()
+                    raise RuntimeError(
+                        f"Could not migrate project_status.{column} to JSONB; "
+                        f"fix the rows holding invalid JSON and restart: {e}"
+                    ) from e
+
             cursor.close()
         finally:
             self._put_connection(conn)
@@ -629,8 +739,16 @@ class ContextManager:
                     0  # Default: pending approval
                 ))
                 
+                # Move the project version read by the conditional GET endpoints
+                cursor.execute("""
+                    UPDATE projects 
+                    SET updated_at = %s
+                    WHERE project_id = %s
+                """, (datetime.now(), project_id))
+                
                 conn.commit()
                 cursor.close()
+                invalidate_project_responses(project_id)
             except Exception as e:
                 # Log error and re-raise
                 import logging
@@ -703,6 +821,169 @@ class ContextManager:
         finally:
             self._put_connection(conn)
 
+    def get_document_for_download(self, project_id: str, document_type: str) -> Optional[Dict[str, Any]]:
+        """
+        Read the latest stored content of a document for download
+
+        Project and content are resolved in one query, so the download sees a
+        single version of the document, and the connection goes back to the
+        pool before the response is streamed.
+
+        Args:
+            project_id: Project identifier
+            document_type: Raw document type string
+
+        Returns:
+            None if the project does not exist, otherwise a dictionary with
+            ``content`` (None if the document has no output)
+        """
+        conn = self._get_connection()
+        try:
+            cursor = conn.cursor(cursor_factory=RealDictCursor)
+            cursor.execute("""
+                SELECT ao.content
+                FROM project_status ps
+                LEFT JOIN LATERAL (
+                    SELECT content
+                    FROM agent_outputs
+                    WHERE project_id = ps.project_id AND document_type = %s
+                    ORDER BY version DESC LIMIT 1
+                ) ao ON true
+                WHERE ps.project_id = %s
+            """, (document_type, project_id))
+            row = cursor.fetchone()
+            cursor.close()
+            if not row:
+                return None
+            return {"content": row["content"]}
+        finally:
+            self._put_connection(conn)
+
+    @staticmethod
+    def iter_document_content_bytes(content: str, chunk_size: int = 65536) -> Iterator[bytes]:
+        """
+        Yield document content as UTF-8 encoded chunks
+
+        Only one encoded chunk exists at a time, so the response never holds a
+        second, encoded copy of the whole document.
+
+        Args:
+            content: Document content (see get_document_for_download)
+            chunk_size: Number of characters encoded per chunk
+        """
+        for start in range(0, len(content), chunk_size):
+            yield content[start:start + chunk_size].encode("utf-8")
+
+    def get_agent_outputs_bulk(self, project_id: str, document_types: List[str]) -> Dict[str, str]:
+        """
+        Get the latest content for several document types in a single query
+
+        Args:
+            project_id: Project identifier
+            document_types: Raw document type strings to look up
+
+        Returns:
+            Mapping of document_type -> content for the types that have output
+        """
+        if not document_types:
+            return {}
+
+        conn = self._get_connection()
+        try:
+            cursor = conn.cursor(cursor_factory=RealDictCursor)
+            cursor.execute("""
+                SELECT DISTINCT ON (document_type) document_type, content
+                FROM agent_outputs
+                WHERE project_id = %s AND document_type = ANY(%s)
+                ORDER BY document_type, version DESC
+            """, (project_id, list(document_types)))
+            contents = {row["document_type"]: row["content"] for row in cursor.fetchall()}
+            cursor.close()
+            return contents
+        finally:
+            self._put_connection(conn)
+
+    def get_project_documents_page(
+        self,
+        project_id: str,
+        limit: int,
+        offset: int = 0,
+        include_content: bool = False,
+        after_position: Optional[int] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Get one page of a project's generated files in a single query
+
+        Pagination is done by the database on project_files, so neither the
+        results JSON nor documents outside the page are loaded.
+
+        Args:
+            project_id: Project identifier
+            limit: Maximum number of documents to return
+            offset: Number of documents to skip (ignored when after_position is set)
+            include_content: Whether to also read the latest content of each document
+            after_position: Keyset cursor; return documents after this position
+
+        Returns:
+            None if the project does not exist, otherwise a dictionary with
+            ``files``, a list of dictionaries with ``doc_id``, ``position``,
+            ``file_path``, ``completed`` (whether the document is listed in
+            completed_agents) and ``content`` (None unless requested)
+        """
+        content_join = """
+                LEFT JOIN LATERAL (
+                    SELECT content
+                    FROM agent_outputs
+                    WHERE project_id = pf.project_id AND document_type = pf.doc_id
+                    ORDER BY version DESC LIMIT 1
+                ) ao ON true
+        """ if include_content else ""
+        content_column = "ao.content" if include_content else "NULL"
+        # Seek past the cursor on the (project_id, position) index rather than
+        # counting and discarding OFFSET rows
+        if after_position is not None:
+            page_filter, page_params = "AND position > %s ORDER BY position LIMIT %s", (after_position, limit)
+        else:
+            page_filter, page_params = "ORDER BY position LIMIT %s OFFSET %s", (limit, offset)
+
+        conn = self._get_connection()
+        try:
+            cursor = conn.cursor(cursor_factory=RealDictCursor)
+            cursor.execute(f"""
+                SELECT pf.doc_id, pf.position, pf.file_path,
+                       COALESCE(ps.completed_agents::jsonb ? pf.doc_id, false) AS completed,
+                       {content_column} AS content
+                FROM project_status ps
+                LEFT JOIN LATERAL (
+                    SELECT project_id, doc_id, position, file_path
+                    FROM project_files
+                    WHERE project_id = ps.project_id
+                    {page_filter}
+                ) pf ON true
+                {content_join}
+                WHERE ps.project_id = %s
+                ORDER BY pf.position
+            """, (*page_params, project_id))
+            rows = cursor.fetchall()
+            cursor.close()
+            if not rows:
+                return None
+            return {
+                "files": [
+                    {
+                        "doc_id": row["doc_id"],
+                        "position": row["position"],
+                        "file_path": row["file_path"],
+                        "completed": row["completed"],
+                        "content": row["content"],
+                    }
+                    for row in rows
+                    if row["doc_id"] is not None
+                ],
+            }
+        finally:
+            self._put_connection(conn)
+
     def get_all_agent_outputs(self, project_id: str) -> Dict[AgentType, AgentOutput]:
         """Get all agent outputs for a project"""
         conn = self._get_connection()
@@ -977,9 +1258,15 @@ class ContextManager:
                         0,  # Default: pending approval
                         json.dumps(selected_documents or []),
                     ))
-                
+
+                # Keep project_files in step with every write of results, including
+                # the initial insert
+                if results is not None or not existing:
+                    self._replace_project_files(cursor, project_id, (results or {}).get("files") or {})
+
                 conn.commit()
                 cursor.close()
+                invalidate_project_responses(project_id)
             except Exception as e:
                 import logging
                 logger = logging.getLogger(__name__)
@@ -1004,6 +1291,31 @@ class ContextManager:
         except (KeyError, IndexError):
             return default
     
+    @staticmethod
+    def _json_column(value: Any, default: Any) -> Any:
+        """Return a JSON column value, parsing it only if it is still stored as TEXT"""
+        if not value:
+            return default
+        if isinstance(value, str):
+            return json.loads(value)
+        return value
+
+    @staticmethod
+    def _replace_project_files(cursor, project_id: str, files: Dict[str, Any]):
+        """Rewrite the project_files rows of a project from a results["files"] mapping"""
+        cursor.execute("DELETE FROM project_files WHERE project_id = %s", (project_id,))
+        if not isinstance(files, dict) or not files:
+            return
+        rows = []
+        for position, (doc_id, file_path) in enumerate(files.items()):
+            path_value = file_path.get("path") if isinstance(file_path, dict) else file_path
+            rows.append((project_id, doc_id, position, path_value if isinstance(path_value, str) else None))
+        execute_values(
+            cursor,
+            "INSERT INTO project_files (project_id, doc_id, position, file_path) VALUES %s",
+            rows,
+        )
+
     def get_project_status(self, project_id: str) -> Optional[Dict]:
         """
         Get project workflow status from database
@@ -1034,9 +1346,9 @@ class ContextManager:
                 "completed_at": row["completed_at"].isoformat() if row["completed_at"] and isinstance(row["completed_at"], datetime) else row["completed_at"],
                 "failed_at": row["failed_at"].isoformat() if row["failed_at"] and isinstance(row["failed_at"], datetime) else row["failed_at"],
                 "error": row["error"],
-                "completed_agents": json.loads(row["completed_agents"] or "[]"),
-                "results": json.loads(row["results"] or "{}") if row["results"] else {},
-                "selected_documents": json.loads(row["selected_documents"] or "[]")
+                "completed_agents": self._json_column(row["completed_agents"], []),
+                "results": self._json_column(row["results"], {}),
+                "selected_documents": self._json_column(row["selected_documents"], [])
                 if "selected_documents" in row.keys()
                 else [],
                 # Handle optional columns that may not exist in older database schemas
@@ -1047,6 +1359,68 @@ class ContextManager:
         finally:
             self._put_connection(conn)
     
+    def get_project_updated_at(self, project_id: str) -> Optional[str]:
+        """
+        Get when a project was last written, without reading its status or documents
+        
+        Every write that invalidates the cached project responses also moves
+        updated_at, so it serves as the version of those responses.
+        
+        Args:
+            project_id: Project identifier
+            
+        Returns:
+            ISO timestamp of the last write, or None if not found
+        """
+        conn = self._get_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute("SELECT updated_at FROM projects WHERE project_id = %s", (project_id,))
+            row = cursor.fetchone()
+            cursor.close()
+            
+            if not row:
+                return None
+            return row[0].isoformat() if isinstance(row[0], datetime) else row[0]
+        finally:
+            self._put_connection(conn)
+    
+    def get_project_status_lite(self, project_id: str) -> Optional[Dict]:
+        """
+        Get the fields reported by the status endpoint, without the results JSON
+        
+        Args:
+            project_id: Project identifier
+            
+        Returns:
+            Dictionary with status, completed_agents, selected_documents, error and
+            updated_at, or None if not found
+        """
+        conn = self._get_connection()
+        try:
+            cursor = conn.cursor(cursor_factory=RealDictCursor)
+            cursor.execute("""
+                SELECT ps.status, ps.completed_agents, ps.selected_documents, ps.error, p.updated_at
+                FROM project_status ps
+                JOIN projects p ON p.project_id = ps.project_id
+                WHERE ps.project_id = %s
+            """, (project_id,))
+            row = cursor.fetchone()
+            cursor.close()
+            
+            if not row:
+                return None
+            
+            return {
+                "status": row["status"],
+                "completed_agents": self._json_column(row["completed_agents"], []),
+                "selected_documents": self._json_column(row["selected_documents"], []),
+                "error": row["error"],
+                "updated_at": row["updated_at"].isoformat() if isinstance(row["updated_at"], datetime) else row["updated_at"],
+            }
+        finally:
+            self._put_connection(conn)
+    
     def approve_phase1(self, project_id: str, notes: Optional[str] = None) -> bool:
         """
         Approve Phase 1 documents to proceed to Phase 2+
@@ -1070,9 +1444,15 @@ class ContextManager:
                     SET phase1_approved = %s, phase1_approved_at = %s, phase1_approval_notes = %s
                     WHERE project_id = %s
                 """, (1, now, notes, project_id))
+                cursor.execute("""
+                    UPDATE projects 
+                    SET updated_at = %s
+                    WHERE project_id = %s
+                """, (now, project_id))
                 
                 conn.commit()
                 cursor.close()
+                invalidate_project_responses(project_id)
                 return True
             except Exception as e:
                 import logging
@@ -1114,9 +1494,15 @@ class ContextManager:
                     SET phase1_approved = %s, phase1_approved_at = %s, phase1_approval_notes = %s, status = %s
                     WHERE project_id = %s
                 """, (2, now, notes, "phase1_rejected", project_id))
+                cursor.execute("""
+                    UPDATE projects 
+                    SET updated_at = %s
+                    WHERE project_id = %s
+                """, (now, project_id))
                 
                 conn.commit()
                 cursor.close()
+                invalidate_project_responses(project_id)
                 return True
             except Exception as e:
                 import logging
@@ -1474,13 +1860,15 @@ class ContextManager:
                 continue
             if wanted and doc_id not in wanted:
                 continue
+            documents_map[doc_id] = dict(entry)
 
-            item = dict(entry)
-            # Content is stored in database, not in files
-            # If content is not in the entry, try to get it from agent_outputs table
-            if include_content and not item.get("content"):
-                item["content"] = self.get_document_content_by_type(project_id, doc_id)
-            documents_map[doc_id] = item
+        # Content is stored in database, not in files
+        # Fetch content missing from the entries from agent_outputs in one query
+        if include_content:
+            missing = [doc_id for doc_id, item in documents_map.items() if not item.get("content")]
+            contents = self.get_agent_outputs_bulk(project_id, missing)
+            for doc_id in missing:
+                documents_map[doc_id]["content"] = contents.get(doc_id)
 
         return documents_map
 
@@ -41,6 +41,11 @@ class AgentType(str, Enum):
     CLAUDE_CLI_DOCUMENTATION = "claude_cli_documentation"
 
 
+# AgentType members by raw value, so a lookup is one dict get instead of an
+# enum call that raises ValueError for unknown values
+AGENT_TYPES_BY_VALUE: Dict[str, AgentType] = {member.value: member for member in AgentType}
+
+
 class DocumentStatus(str, Enum):
     """Status of document generation"""
     PENDING = "pending"
@@ -692,14 +692,8 @@ Issues Identified:
                     document_result["content"] = improved_content
                     # Update DB
                     try:
-                        from src.context.shared_context import AgentType, DocumentStatus, AgentOutput
-                        try:
-                            agent_type = AgentType(document_id)
-                        except ValueError:
-                            try:
-                                agent_type = AgentType.TECHNICAL_DOCUMENTATION
-                            except:
-                                agent_type = list(AgentType)[0]
+                        from src.context.shared_context import AGENT_TYPES_BY_VALUE, AgentType, DocumentStatus, AgentOutput
+                        agent_type = AGENT_TYPES_BY_VALUE.get(document_id, AgentType.TECHNICAL_DOCUMENTATION)
                         
                         output = AgentOutput(
                             agent_type=agent_type,
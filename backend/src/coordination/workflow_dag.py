@@ -2,12 +2,13 @@
 Workflow DAG Configuration
 Defines the dependency graph for document generation workflow (Phase 1 and Phase 2)
 """
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
 from dataclasses import dataclass
+from functools import lru_cache
 from src.context.shared_context import AgentType
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class WorkflowTask:
     """
     Unified configuration for all workflow tasks (Phase 1-5)
@@ -18,6 +19,10 @@ class WorkflowTask:
     - Phase 3: Development & Testing
     - Phase 4: User & Support
     - Phase 5: (Currently empty - management documents moved to Phase 1)
+    
+    Instances are frozen: the configured tasks are shared by every caller (and
+    cached per profile), so adjusted copies are made with dataclasses.replace.
+    Slots keep the many cached instances small and attribute reads direct.
     """
     task_id: str
     agent_type: AgentType
@@ -804,21 +809,7 @@ def build_phase1_task_dependencies(tasks: List[WorkflowTask]) -> Dict[str, List[
     Returns:
         Dictionary mapping task_id to list of dependency task_ids
     """
-    # Create mapping from AgentType to task_id
-    agent_type_to_task_id = {task.agent_type: task.task_id for task in tasks}
-    
-    # Build dependency map
-    dependency_map = {}
-    for task in tasks:
-        # Convert AgentType dependencies to task_id dependencies
-        dep_task_ids = []
-        for dep_type in task.dependencies:
-            if dep_type in agent_type_to_task_id:
-                dep_task_ids.append(agent_type_to_task_id[dep_type])
-        
-        dependency_map[task.task_id] = dep_task_ids
-    
-    return dependency_map
+    return build_task_dependencies(tasks)
 
 
 def get_phase2_tasks_for_profile(profile: str = "team") -> List[WorkflowTask]:
@@ -831,7 +822,14 @@ def get_phase2_tasks_for_profile(profile: str = "team") -> List[WorkflowTask]:
     Returns:
         List of WorkflowTask objects for all phases 2-5
     """
-    return get_tasks_for_phases(profile=profile, phases=[2, 3, 4, 5])
+    # The task configuration is static, so the selection is computed once per
+    # profile; each caller gets its own list
+    return list(_phase2_tasks_for_profile(profile))
+
+
+@lru_cache(maxsize=4)
+def _phase2_tasks_for_profile(profile: str) -> Tuple[WorkflowTask, ...]:
+    return tuple(get_tasks_for_phases(profile=profile, phases=[2, 3, 4, 5]))
 
 
 def get_tasks_for_phases(profile: str = "team", phases: List[int] = None) -> List[WorkflowTask]:
@@ -917,22 +915,15 @@ def build_task_dependencies(tasks: List[WorkflowTask]) -> Dict[str, List[str]]:
     # Create mapping from AgentType to task_id
     agent_type_to_task_id = {task.agent_type: task.task_id for task in tasks}
     
-    # Build dependency map
-    # Note: Phase 1 dependencies (REQUIREMENTS_ANALYST, TECHNICAL_DOCUMENTATION) are already complete
-    # and don't have task_ids in Phase 2+, so we handle them specially in the dependency resolution
-    dependency_map = {}
-    for task in tasks:
-        # Convert AgentType dependencies to task_id dependencies
-        # Note: Phase 1 dependencies don't have task_ids in Phase 2, so we need to handle them specially
-        dep_task_ids = []
-        for dep_type in task.dependencies:
-            # Check if this dependency is a Phase 2 task
-            if dep_type in agent_type_to_task_id:
-                dep_task_ids.append(agent_type_to_task_id[dep_type])
-            # Phase 1 dependencies are already complete, so we don't need to track them in dependencies
-            # The ParallelExecutor will handle this by checking if dependencies are complete
-            # For Phase 1 dependencies, we assume they're always available (completed in Phase 1)
-        
-        dependency_map[task.task_id] = dep_task_ids
-    
-    return dependency_map
+    # Convert AgentType dependencies to task_id dependencies in one pass.
+    # Phase 1 dependencies (REQUIREMENTS_ANALYST, TECHNICAL_DOCUMENTATION) have no
+    # task_id in Phase 2+: they are already complete, so they are left out and the
+    # ParallelExecutor treats them as available.
+    return {
+        task.task_id: [
+            agent_type_to_task_id[dep_type]
+            for dep_type in task.dependencies
+            if dep_type in agent_type_to_task_id
+        ]
+        for task in tasks
+    }
@@ -9,7 +9,7 @@ import random
 from collections import deque
 from functools import wraps
 from threading import Lock
-from typing import Optional
+from typing import Callable, Optional
 from src.utils.logger import get_logger
 from src.rate_limit.daily_limit_manager import get_daily_limit_manager
 
@@ -19,13 +19,17 @@ logger = get_logger(__name__)
 class RequestQueue:
     """Manages API request rate limiting and queuing"""
     
-    def __init__(self, max_rate=2, period=60, safety_margin=0.9, max_daily_requests: Optional[int] = None):
+    def __init__(self, max_rate=2, period=60, safety_margin=0.9, max_daily_requests: Optional[int] = None,
+                 time_fn: Callable[[], float] = time.monotonic,
+                 sleep_fn: Callable[[float], None] = time.sleep):
         """
         Args:
             max_rate: Maximum number of requests per period (default 2 for Gemini free tier)
             period: Time period in seconds (default 60 seconds = 1 minute)
             safety_margin: Safety margin multiplier (0.9 = use 90% of max_rate to avoid hitting limits)
             max_daily_requests: Maximum requests per day (default 50 for Gemini free tier)
+            time_fn: Clock used to time the rate-limit window (injectable for tests)
+            sleep_fn: Function used to wait when the limit is reached (injectable for tests)
         """
         # Store original max_rate for reference
         self.original_max_rate = max_rate
@@ -35,6 +39,8 @@ class RequestQueue:
         self.request_times = deque()
         self.cache = {}
         self.lock = Lock()
+        self._time = time_fn
+        self._sleep = sleep_fn
         
         # Initialize daily limit manager
         if max_daily_requests is None:
@@ -49,13 +55,13 @@ class RequestQueue:
     
     def _clean_old_requests(self):
         """Remove requests older than the period"""
-        current_time = time.time()
+        current_time = self._time()
         while self.request_times and self.request_times[0] < current_time - self.period:
             self.request_times.popleft()
     
     def _wait_if_needed(self):
         """Wait if we've hit the rate limit"""
-        current_time = time.time()
+        current_time = self._time()
         
         with self.lock:
             self._clean_old_requests()
@@ -69,16 +75,16 @@ class RequestQueue:
                     wait_time = (oldest_request + self.period) - current_time + 0.5  # Increased buffer
                     if wait_time > 0:
                         logger.warning(f"⏳ Rate limit reached: Waiting {wait_time:.2f} seconds...")
-                        time.sleep(wait_time)
+                        self._sleep(wait_time)
                         self._clean_old_requests()
                 else:
                     # Approaching limit - add small jitter to spread requests
                     jitter = random.uniform(0, 0.5)
                     if jitter > 0.1:  # Only sleep if jitter is meaningful
-                        time.sleep(jitter)
+                        self._sleep(jitter)
             
             # Record this request
-            self.request_times.append(time.time())
+            self.request_times.append(self._time())
     
     def execute(self, func, *args, **kwargs):
         """
@@ -240,6 +240,7 @@ if celery_app:
         broker_connection_retry=True,  # Enable connection retries
         broker_connection_max_retries=3,  # Reduced retries to fail faster when limit exceeded
         broker_connection_retry_delay=10.0,  # Longer delay between retries (10 seconds)
+        broker_pool_limit=10,  # Bounded pool of broker connections reused by task submissions
         
         # SSL configuration for Redis broker (Upstash requires SSL)
         broker_transport_options=broker_transport_options,
@@ -309,4 +310,17 @@ if celery_app:
                         os._exit(0)  # Exit code 0 = graceful (non-zero would cause Railway to restart)
         except Exception as e:
             logger.warning(f"Error checking Redis on worker start: {e}")
-            # Don't exit - let Celery handle it
\ No newline at end of file
+            # Don't exit - let Celery handle it
+
+
+def warm_producer_pool() -> None:
+    """
+    Open a broker connection in the producer pool ahead of the first task submission.
+    
+    The first .apply_async() otherwise pays the TCP/TLS handshake to Redis inside
+    a request. Does nothing when the Celery app was not created.
+    """
+    if celery_app is None:
+        return
+    with celery_app.producer_pool.acquire(block=True) as producer:
+        producer.connection.ensure_connection(max_retries=1)
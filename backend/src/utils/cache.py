@@ -169,6 +169,57 @@ def invalidate_cache(pattern: str) -> int:
         return 0
 
 
+# Project read responses are invalidated on every write, so the TTL only bounds
+# staleness for writes that bypass ContextManager
+PROJECT_RESPONSE_TTL = 5
+
+
+def _project_response_key(project_id: str) -> str:
+    """All cached responses for a project live in one hash, so one DEL invalidates them"""
+    return f"project_response:{project_id}"
+
+
+def get_cached_project_response(project_id: str, field: str) -> Optional[str]:
+    """Get a serialized project API response from cache"""
+    if not REDIS_AVAILABLE:
+        return None
+    
+    try:
+        return redis_client.hget(_project_response_key(project_id), field)
+    except Exception:
+        return None
+
+
+def set_cached_project_response(
+    project_id: str, field: str, body: str, ttl: int = PROJECT_RESPONSE_TTL
+) -> bool:
+    """Cache a serialized project API response"""
+    if not REDIS_AVAILABLE:
+        return False
+    
+    try:
+        key = _project_response_key(project_id)
+        pipe = redis_client.pipeline()
+        pipe.hset(key, field, body)
+        pipe.expire(key, ttl)
+        pipe.execute()
+        return True
+    except Exception:
+        return False
+
+
+def invalidate_project_responses(project_id: str) -> bool:
+    """Drop every cached API response for a project"""
+    if not REDIS_AVAILABLE:
+        return False
+    
+    try:
+        redis_client.delete(_project_response_key(project_id))
+        return True
+    except Exception:
+        return False
+
+
 def cache_document_templates(ttl: int = 86400) -> callable:
     """Cache document templates (cache for 24 hours by default)"""
     return cache_result(ttl=ttl, key_prefix="doc_templates")
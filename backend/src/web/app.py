@@ -26,6 +26,7 @@ Monitoring:
 """
 from __future__ import annotations
 
+import asyncio
 import os
 import re
 import uuid
@@ -45,7 +46,9 @@ from src.config.document_catalog import load_document_definitions
 from src.coordination.coordinator import WorkflowCoordinator
 from src.context.context_manager import ContextManager
 from src.utils.logger import get_logger
+from src.tasks.celery_app import REDIS_AVAILABLE, REDIS_URL, warm_producer_pool
 from src.web.monitoring import increment_counter
+from src.web.utils import OrjsonResponse
 from src.web.routers import documents, projects, websocket, metrics
 from src.web import health
 from src.web.routers.projects import set_context_manager, set_limiter as set_projects_limiter
@@ -91,8 +94,27 @@ def get_allowed_origins() -> list[str]:
 
 ALLOWED_ORIGINS = get_allowed_origins()
 
-# Rate limiter
-limiter = Limiter(key_func=get_remote_address)
+def get_rate_limit_storage_uri() -> str:
+    """
+    Get the rate limiter storage URI.
+    
+    Uses Redis when it is reachable so all workers share one set of counters,
+    otherwise falls back to per-process memory storage.
+    """
+    if not REDIS_AVAILABLE:
+        return "memory://"
+    # Upstash requires SSL, convert redis:// to rediss://
+    if "upstash.io" in REDIS_URL and not REDIS_URL.startswith("rediss://"):
+        return REDIS_URL.replace("redis://", "rediss://", 1)
+    return REDIS_URL
+
+
+# Rate limiter (falls back to memory if Redis becomes unreachable at runtime)
+limiter = Limiter(
+    key_func=get_remote_address,
+    storage_uri=get_rate_limit_storage_uri(),
+    in_memory_fallback_enabled=True,
+)
 
 # Global coordinator/context instances
 coordinator: Optional[WorkflowCoordinator] = None
@@ -184,6 +206,7 @@ async def lifespan(app: FastAPI):
     - Creates database connection manager
     - Initializes workflow coordinator
     - Loads document definitions
+    - Opens a Celery broker connection in the producer pool
     - Configures routers with dependencies
     
     Shutdown:
@@ -225,6 +248,13 @@ async def lifespan(app: FastAPI):
     from src.web.websocket_manager import websocket_manager
     await websocket_manager.connect_redis()
     
+    # Open the Celery broker connection now instead of in the first project submission
+    if REDIS_AVAILABLE:
+        try:
+            await asyncio.to_thread(warm_producer_pool)
+        except Exception as e:
+            logger.warning(f"Could not warm Celery producer pool: {e}")
+    
     logger.info("OmniDoc API initialized successfully")
     yield
     
@@ -238,6 +268,7 @@ app = FastAPI(
     version="2.0.0",
     description="AI-powered documentation generation API",
     lifespan=lifespan,
+    default_response_class=OrjsonResponse,  # orjson serializes far faster than stdlib json
 )
 app.state.limiter = limiter
 app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
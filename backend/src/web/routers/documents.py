@@ -1,16 +1,13 @@
 """Document template-related API endpoints"""
 from __future__ import annotations
 
-import json
-import os
-from pathlib import Path
 from typing import List, Optional
 
 from fastapi import APIRouter, Request
 from pydantic import BaseModel, Field
 from slowapi import Limiter
 
-from src.config.document_catalog import load_document_definitions, get_all_dependencies
+from src.config.document_catalog import load_document_definitions, get_all_dependencies, get_catalog_metadata
 from src.utils.cache import cache_document_templates
 
 router = APIRouter(prefix="/api/document-templates", tags=["documents"])
@@ -75,36 +72,11 @@ async def get_document_templates(request: Request) -> DocumentCatalogResponse:
     if definitions is None:
         # Fallback to loading (shouldn't happen after startup)
         definitions = load_document_definitions()
-    generated_at: Optional[str] = None
-    source: Optional[str] = None
 
-    # Get document config path, with smart fallback for new backend/ structure
-    env_path = os.getenv("DOCUMENT_CONFIG_PATH")
-    if env_path:
-        catalog_file = Path(env_path)
-        # If relative, try to resolve from project root
-        if not catalog_file.is_absolute():
-            # Try to find project root (go up from backend/src/web/routers/)
-            current_file = Path(__file__)
-            project_root = current_file.parent.parent.parent.parent  # backend/src/web/routers -> project root
-            catalog_file = project_root / catalog_file
-    else:
-        # Default: try backend/config/document_definitions.json
-        current_file = Path(__file__)
-        project_root = current_file.parent.parent.parent.parent
-        catalog_file = project_root / "backend" / "config" / "document_definitions.json"
-        # Fallback to old location
-        if not catalog_file.exists():
-            catalog_file = project_root / "config" / "document_definitions.json"
-    if catalog_file.exists():
-        try:
-            payload = json.loads(catalog_file.read_text(encoding="utf-8"))
-            generated_at = payload.get("generated_at")
-            source = payload.get("source")
-        except json.JSONDecodeError:
-            from src.utils.logger import get_logger
-            logger = get_logger(__name__)
-            logger.warning("Unable to parse catalog metadata from %s", catalog_file)
+    # Catalog metadata is parsed once alongside the definitions
+    metadata = get_catalog_metadata()
+    generated_at = metadata["generated_at"]
+    source = metadata["source"]
 
     documents = [
         DocumentTemplate(
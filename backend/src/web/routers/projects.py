@@ -1,23 +1,31 @@
 """Project-related API endpoints"""
 from __future__ import annotations
 
+import base64
+import binascii
+import hashlib
 import os
-import uuid
-from datetime import datetime
+import re
+import secrets
+import time
+import urllib.parse
 from pathlib import Path
-from typing import List, Optional, Set
+from typing import List, Optional
 
-from fastapi import APIRouter, HTTPException, Request, Query, Depends, BackgroundTasks
-from fastapi.responses import FileResponse
-from pydantic import BaseModel, Field
+from fastapi import APIRouter, HTTPException, Request, Query, BackgroundTasks
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import Response, StreamingResponse
+from pydantic import BaseModel, Field, field_validator
 from slowapi import Limiter
 
-from src.config.document_catalog import get_document_by_id
+from src.config.document_catalog import get_document_names
 from src.context.context_manager import ContextManager
+from src.context.shared_context import AGENT_TYPES_BY_VALUE
 from src.utils.logger import get_logger
-from src.tasks.celery_app import REDIS_AVAILABLE, check_redis_available
-from src.web.utils import parse_json_field
-from src.web.dependencies import get_context_manager, ContextManagerDep
+from src.tasks.celery_app import REDIS_AVAILABLE, celery_app, check_redis_available
+from src.utils.cache import get_cached_project_response, set_cached_project_response
+from src.web.utils import is_valid_project_id
+from src.web.dependencies import ContextManagerDep
 
 # Import Celery task if available, otherwise use None
 try:
@@ -36,6 +44,22 @@ logger = get_logger(__name__)
 
 router = APIRouter(prefix="/api/projects", tags=["projects"])
 
+# Filename sanitization for downloads
+_FILENAME_STRIP_RE = re.compile(r'[^\w\s-]')
+_FILENAME_DASH_RE = re.compile(r'[-\s]+')
+
+
+def _validate_project_id(project_id: str) -> None:
+    """Reject malformed project IDs before any database access"""
+    if not is_valid_project_id(project_id):
+        raise HTTPException(status_code=400, detail="Invalid project ID format.")
+
+
+def _new_project_id() -> str:
+    """Build a project_YYYYMMDD_HHMMSS_<8 hex> id without creating a datetime or UUID"""
+    return f"project_{time.strftime('%Y%m%d_%H%M%S')}_{secrets.token_hex(4)}"
+
+
 # Rate limiter (will be set by main app)
 limiter: Optional[Limiter] = None
 
@@ -74,10 +98,18 @@ def apply_rate_limit(limit_str: str):
 
 class ProjectCreateRequest(BaseModel):
     user_idea: str = Field(..., min_length=1, max_length=5000)
-    selected_documents: List[str] = Field(default_factory=list)
+    selected_documents: List[str] = Field(default_factory=list, max_length=100)
     provider_name: Optional[str] = Field(default=None, max_length=100)
     codebase_path: Optional[str] = None
 
+    @field_validator("selected_documents")
+    @classmethod
+    def dedupe_selected_documents(cls, value: List[str]) -> List[str]:
+        """Remove duplicates while preserving order (skip the rebuild when there are none)"""
+        if len(value) != len(set(value)):
+            return list(dict.fromkeys(value))
+        return value
+
 
 class BrickAndMortarProjectRequest(BaseModel):
     user_idea: str = Field(..., min_length=1, max_length=5000)
@@ -110,6 +142,100 @@ class GeneratedDocument(BaseModel):
 class ProjectDocumentsResponse(BaseModel):
     project_id: str
     documents: List[GeneratedDocument] = Field(default_factory=list)
+    next_cursor: Optional[str] = None
+
+
+def _encode_documents_cursor(position: int) -> str:
+    """Encode the position of the last document on a page as an opaque cursor"""
+    return base64.urlsafe_b64encode(str(position).encode("ascii")).decode("ascii")
+
+
+def _decode_documents_cursor(cursor: str) -> int:
+    """Decode a cursor produced by _encode_documents_cursor, raising 400 if malformed"""
+    try:
+        return int(base64.urlsafe_b64decode(cursor.encode("ascii")).decode("ascii"))
+    except (ValueError, UnicodeError, binascii.Error):
+        raise HTTPException(status_code=400, detail="Invalid cursor.")
+
+
+def _submit_generation_task(**task_kwargs):
+    """Submit generate_documents_task on a producer from the bounded broker connection pool"""
+    with celery_app.producer_pool.acquire(block=True) as producer:
+        return generate_documents_task.apply_async(kwargs=task_kwargs, producer=producer)
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check an If-None-Match header against an ETag (weak comparison)"""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+def _version_etag(updated_at: str, cache_field: str) -> str:
+    """ETag of a project read response: the project's last write plus the response variant"""
+    digest = hashlib.blake2b(f"{updated_at}|{cache_field}".encode("utf-8"), digest_size=8).hexdigest()
+    return f'"{digest}"'
+
+
+def _not_modified(request: Optional[Request], etag: str) -> Optional[Response]:
+    """Answer 304 Not Modified with no body when the request's If-None-Match names etag"""
+    if request is not None and _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    return None
+
+
+def _body_response(body, request: Optional[Request] = None, etag: Optional[str] = None) -> Response:
+    """
+    Build a JSON response carrying an ETag, by default a hash of its body.
+    
+    Answers 304 Not Modified when the request's If-None-Match already names that
+    ETag, so polling clients do not re-download unchanged payloads.
+    """
+    raw = body.encode("utf-8") if isinstance(body, str) else body
+    if etag is None:
+        etag = f'"{hashlib.blake2b(raw, digest_size=8).hexdigest()}"'
+    not_modified = _not_modified(request, etag)
+    if not_modified is not None:
+        return not_modified
+    return Response(content=raw, media_type="application/json", headers={"ETag": etag})
+
+
+def _json_response(
+    model: BaseModel,
+    project_id: Optional[str] = None,
+    cache_field: Optional[str] = None,
+    request: Optional[Request] = None,
+    etag: Optional[str] = None,
+) -> Response:
+    """
+    Serialize a response model directly, bypassing FastAPI's response_model validation.
+    
+    Used with models built via model_construct from server-side data; the route's
+    response_model still documents the schema. When cache_field is given the
+    serialized body is also cached for the project (see _cached_response). When
+    request is given the response is conditional (see _body_response).
+    """
+    body = model.model_dump_json()
+    if project_id and cache_field:
+        set_cached_project_response(project_id, cache_field, body)
+    return _body_response(body, request, etag)
+
+
+def _cached_response(
+    project_id: str,
+    cache_field: str,
+    request: Optional[Request] = None,
+    etag: Optional[str] = None,
+) -> Optional[Response]:
+    """Return a cached response body for the project, if one is still valid"""
+    body = get_cached_project_response(project_id, cache_field)
+    if body is None:
+        return None
+    return _body_response(body, request, etag)
 
 
 @router.post("", response_model=ProjectCreateResponse, status_code=202)
@@ -134,9 +260,9 @@ async def create_project(
     # Sanitize user input (basic sanitization)
     user_idea = project_request.user_idea.strip()[:5000]
     
-    project_id = f"project_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}"
-    # Remove duplicates while preserving order
-    selected_documents = list(dict.fromkeys(project_request.selected_documents))
+    project_id = _new_project_id()
+    # Already deduplicated by ProjectCreateRequest
+    selected_documents = project_request.selected_documents
 
     cm.create_project(project_id, user_idea)
     cm.update_project_status(
@@ -157,7 +283,7 @@ async def create_project(
     if use_celery:
         # Submit task to Celery queue
         try:
-            task = generate_documents_task.delay(
+            task = _submit_generation_task(
                 project_id=project_id,
                 user_idea=user_idea,
                 selected_documents=selected_documents,
@@ -166,8 +292,6 @@ async def create_project(
             )
             
             logger.info(f"✅ Submitted Celery task {task.id} for project {project_id} [Request-ID: {getattr(request.state, 'request_id', 'N/A')}]")
-            import sys
-            print(f"[TASK SUBMITTED] Task ID: {task.id}, Project: {project_id}, Queue: celery", file=sys.stderr, flush=True)
         except Exception as exc:
             error_msg = f"Failed to submit task to Celery queue: {str(exc)}"
             logger.warning(f"{error_msg}. Falling back to BackgroundTasks. [Request-ID: {getattr(request.state, 'request_id', 'N/A')}]")
@@ -200,8 +324,6 @@ async def create_project(
             provider_name=project_request.provider_name,
             codebase_path=project_request.codebase_path,
         )
-        import sys
-        print(f"[TASK SUBMITTED] Project: {project_id}, Queue: fastapi-background-tasks (fallback)", file=sys.stderr, flush=True)
 
     return ProjectCreateResponse(
         project_id=project_id,
@@ -210,8 +332,8 @@ async def create_project(
     )
 
 
-# List of all brick-and-mortar document IDs
-BRICK_AND_MORTAR_DOCUMENTS = [
+# All brick-and-mortar document IDs (immutable, shared across requests)
+BRICK_AND_MORTAR_DOCUMENTS = (
     "business_overview",
     "operations_plan",
     "market_research",
@@ -224,7 +346,7 @@ BRICK_AND_MORTAR_DOCUMENTS = [
     "customer_experience_playbook",
     "growth_expansion_plan",
     "execution_roadmap",
-]
+)
 
 
 @router.post("/brick-and-mortar", response_model=ProjectCreateResponse, status_code=202)
@@ -274,10 +396,10 @@ async def create_brick_and_mortar_project(
     user_idea = project_request.user_idea.strip()[:5000]
     
     # Generate project ID
-    project_id = f"project_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}"
+    project_id = _new_project_id()
     
-    # Use all 12 brick-and-mortar documents
-    selected_documents = BRICK_AND_MORTAR_DOCUMENTS.copy()
+    # Use all 12 brick-and-mortar documents; the tuple serializes as a JSON array
+    selected_documents = BRICK_AND_MORTAR_DOCUMENTS
 
     # Create project in database
     cm.create_project(project_id, user_idea)
@@ -299,7 +421,7 @@ async def create_brick_and_mortar_project(
     if use_celery:
         # Submit task to Celery queue
         try:
-            task = generate_documents_task.delay(
+            task = _submit_generation_task(
                 project_id=project_id,
                 user_idea=user_idea,
                 selected_documents=selected_documents,
@@ -311,13 +433,6 @@ async def create_brick_and_mortar_project(
                 f"✅ Submitted brick-and-mortar Celery task {task.id} for project {project_id} "
                 f"with {len(selected_documents)} documents [Request-ID: {getattr(request.state, 'request_id', 'N/A')}]"
             )
-            import sys
-            print(
-                f"[BRICK-AND-MORTAR TASK SUBMITTED] Task ID: {task.id}, Project: {project_id}, "
-                f"Documents: {len(selected_documents)}, Queue: celery",
-                file=sys.stderr,
-                flush=True
-            )
         except Exception as exc:
             error_msg = f"Failed to submit task to Celery queue: {str(exc)}"
             logger.warning(f"{error_msg}. Falling back to BackgroundTasks. [Request-ID: {getattr(request.state, 'request_id', 'N/A')}]")
@@ -349,13 +464,6 @@ async def create_brick_and_mortar_project(
             provider_name=project_request.provider_name,
             codebase_path=None,
         )
-        import sys
-        print(
-            f"[BRICK-AND-MORTAR TASK SUBMITTED] Project: {project_id}, "
-            f"Documents: {len(selected_documents)}, Queue: fastapi-background-tasks (fallback)",
-            file=sys.stderr,
-            flush=True
-        )
 
     return ProjectCreateResponse(
         project_id=project_id,
@@ -370,7 +478,7 @@ async def get_project_status(
     request: Request,
     project_id: str,
     cm: ContextManagerDep
-) -> ProjectStatusResponse:
+) -> Response:
     """
     Returns the project status including:
     - Current generation status (pending, in_progress, complete, failed)
@@ -389,16 +497,33 @@ async def get_project_status(
     Raises:
         HTTPException: 400 if project_id format invalid, 404 if project not found
     """
-    # Validate project_id format
-    if not project_id or not project_id.startswith("project_") or len(project_id) > 255:
-        raise HTTPException(status_code=400, detail="Invalid project ID format.")
+    _validate_project_id(project_id)
 
-    status_row = cm.get_project_status(project_id)
+    # Status is polled while documents generate. The ETag only depends on the
+    # project's last write, so an unchanged status is answered from one primary
+    # key lookup without reading or serializing the body
+    updated_at = await run_in_threadpool(cm.get_project_updated_at, project_id)
+    if updated_at is None:
+        raise HTTPException(status_code=404, detail="Project not found.")
+    etag = _version_etag(updated_at, "status")
+    not_modified = _not_modified(request, etag)
+    if not_modified is not None:
+        return not_modified
+
+    # Cached bodies are keyed by version, so a body cached before a write is
+    # never served under the ETag of a later one
+    cache_field = f"status@{updated_at}"
+    cached = _cached_response(project_id, cache_field, request, etag)
+    if cached is not None:
+        return cached
+
+    # Only the reported columns; results can be large and is not needed here
+    status_row = await run_in_threadpool(cm.get_project_status_lite, project_id)
     if not status_row:
         raise HTTPException(status_code=404, detail="Project not found.")
 
-    completed_agents = parse_json_field(status_row.get("completed_agents"), default=[])
-    selected_documents = parse_json_field(status_row.get("selected_documents"), default=[])
+    completed_agents = status_row.get("completed_agents") or []
+    selected_documents = status_row.get("selected_documents") or []
     
     # Ensure both are lists
     if not isinstance(completed_agents, list):
@@ -406,14 +531,15 @@ async def get_project_status(
     if not isinstance(selected_documents, list):
         selected_documents = []
 
-    return ProjectStatusResponse(
+    # Server-side data is already typed; skip re-validation
+    return _json_response(ProjectStatusResponse.model_construct(
         project_id=project_id,
         status=status_row["status"],
         selected_documents=selected_documents,
         completed_documents=completed_agents,
         error=status_row.get("error"),
         updated_at=status_row.get("updated_at"),
-    )
+    ), project_id, cache_field, request, etag)
 
 
 @router.get("/{project_id}/documents", response_model=ProjectDocumentsResponse)
@@ -424,18 +550,26 @@ async def get_project_documents(
     cm: ContextManagerDep,
     page: int = Query(1, ge=1, description="Page number (1-indexed)"),
     page_size: int = Query(50, ge=1, le=100, description="Number of documents per page"),
-) -> ProjectDocumentsResponse:
+    include_content: bool = Query(False, description="Include full document content in the response"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page; replaces page"),
+) -> Response:
     """
     Get all documents for a project with pagination support.
     
+    Document content is omitted (null) unless include_content is set; fetch a
+    single document or download it to read its content.
+    
+    Pages can be requested by number, or by passing the next_cursor of the
+    previous response, which stays fast however deep the page is.
+    
     Args:
         project_id: Project identifier
         page: Page number (1-indexed, default: 1)
         page_size: Number of documents per page (default: 50, max: 100)
+        include_content: Whether to read and inline document content (default: False)
+        cursor: Keyset cursor from a previous response (takes precedence over page)
     """
-    # Validate project_id format
-    if not project_id or not project_id.startswith("project_") or len(project_id) > 255:
-        raise HTTPException(status_code=400, detail="Invalid project ID format.")
+    _validate_project_id(project_id)
     
     # Validate pagination parameters
     if page < 1:
@@ -443,65 +577,67 @@ async def get_project_documents(
     if page_size < 1 or page_size > 100:
         raise HTTPException(status_code=400, detail="Page size must be between 1 and 100")
 
-    status_row = cm.get_project_status(project_id)
-    if not status_row:
-        raise HTTPException(status_code=404, detail="Project not found.")
-
-    results_raw = parse_json_field(status_row.get("results"), default={})
-    if not isinstance(results_raw, dict):
-        results_raw = {}
+    after_position = _decode_documents_cursor(cursor) if cursor is not None else None
+    page_key = f"c{after_position}" if after_position is not None else page
+    variant = f"documents:{page_key}:{page_size}:{int(include_content)}"
 
-    files = results_raw.get("files", {})
-    all_documents: List[GeneratedDocument] = []
-    
-    # Parse completed_agents to check document status
-    completed_agents = parse_json_field(status_row.get("completed_agents"), default=[])
-    completed_agents_set: Set[str] = set(completed_agents) if isinstance(completed_agents, list) else set()
-    
-    for doc_id, file_path in files.items():
-        definition = get_document_by_id(doc_id)
-        doc_name = definition.name if definition else doc_id.replace("_", " ").title()
-        path_value = file_path.get("path") if isinstance(file_path, dict) else file_path
-        content: Optional[str] = None
+    # As for the status endpoint, an unchanged page is answered without reading it
+    updated_at = await run_in_threadpool(cm.get_project_updated_at, project_id)
+    if updated_at is None:
+        raise HTTPException(status_code=404, detail="Project not found.")
+    etag = _version_etag(updated_at, variant)
+    not_modified = _not_modified(request, etag)
+    if not_modified is not None:
+        return not_modified
+
+    cache_field = f"{variant}@{updated_at}"
+    cached = _cached_response(project_id, cache_field, request, etag)
+    if cached is not None:
+        return cached
+
+    # Pagination and content lookups are done by the database, one query per page,
+    # on a worker thread so the blocking psycopg2 call does not stall the event loop
+    page_data = await run_in_threadpool(
+        cm.get_project_documents_page,
+        project_id,
+        limit=page_size,
+        offset=(page - 1) * page_size,
+        include_content=include_content,
+        after_position=after_position,
+    )
+    if page_data is None:
+        raise HTTPException(status_code=404, detail="Project not found.")
 
-        # Get content from database (agent_outputs table)
-        try:
-            # Try to get from agent_outputs by document_type
-            from src.context.shared_context import AgentType
-            # Map document_id to agent_type if possible
-            agent_type = None
-            try:
-                agent_type = AgentType(doc_id)
-            except ValueError:
-                # Not a standard AgentType, try to find by document_type
-                pass
-            
-            if agent_type:
-                agent_output = cm.get_agent_output(project_id, agent_type)
-                if agent_output:
-                    content = agent_output.content
-            else:
-                # Try to find by document_type directly
-                content = cm.get_document_content_by_type(project_id, doc_id)
-        except Exception as exc:
-            logger.warning("Failed to read document %s from database: %s", doc_id, exc)
+    documents: List[GeneratedDocument] = []
+    document_names = get_document_names()
+    for row in page_data["files"]:
+        doc_id = row["doc_id"]
+        doc_name = document_names.get(doc_id) or doc_id.replace("_", " ").title()
 
-        all_documents.append(
-            GeneratedDocument(
+        documents.append(
+            GeneratedDocument.model_construct(
                 id=doc_id,
                 name=doc_name,
-                status="complete" if doc_id in completed_agents_set else "pending",
-                file_path=path_value if isinstance(path_value, str) else None,  # Virtual path for reference
-                content=content,  # Content from database
+                status="complete" if row["completed"] else "pending",
+                file_path=row["file_path"],  # Virtual path for reference
+                content=row["content"],  # Content from database
             )
         )
 
-    # Apply pagination
-    start_idx = (page - 1) * page_size
-    end_idx = start_idx + page_size
-    documents = all_documents[start_idx:end_idx]
-
-    return ProjectDocumentsResponse(project_id=project_id, documents=documents)
+    # A full page may be followed by more documents
+    next_cursor = None
+    if len(page_data["files"]) == page_size:
+        next_cursor = _encode_documents_cursor(page_data["files"][-1]["position"])
+
+    return _json_response(
+        ProjectDocumentsResponse.model_construct(
+            project_id=project_id, documents=documents, next_cursor=next_cursor
+        ),
+        project_id,
+        cache_field,
+        request,
+        etag,
+    )
 
 
 @router.get("/{project_id}/documents/{document_id}", response_model=GeneratedDocument)
@@ -511,7 +647,7 @@ async def get_single_document(
     project_id: str,
     document_id: str,
     cm: ContextManagerDep
-) -> GeneratedDocument:
+) -> Response:
     """
     Get a specific generated document by its ID.
     
@@ -530,17 +666,15 @@ async def get_single_document(
         HTTPException: 400 if IDs invalid, 404 if project or document not found
     """
     # Validate IDs
-    if not project_id or not project_id.startswith("project_") or len(project_id) > 255:
-        raise HTTPException(status_code=400, detail="Invalid project ID format.")
+    _validate_project_id(project_id)
     if not document_id or len(document_id) > 255:
         raise HTTPException(status_code=400, detail="Invalid document ID format.")
 
-    catalog_doc = get_document_by_id(document_id)
-    status_row = cm.get_project_status(project_id)
+    status_row = await run_in_threadpool(cm.get_project_status, project_id)
     if not status_row:
         raise HTTPException(status_code=404, detail="Project not found.")
 
-    results_raw = parse_json_field(status_row.get("results"), default={})
+    results_raw = status_row.get("results") or {}
     if not isinstance(results_raw, dict):
         results_raw = {}
 
@@ -548,29 +682,24 @@ async def get_single_document(
     if document_id not in files:
         raise HTTPException(status_code=404, detail="Document not generated.")
 
-    # Parse completed_agents to check document status
-    completed_agents = parse_json_field(status_row.get("completed_agents"), default=[])
-    completed_agents_set: Set[str] = set(completed_agents) if isinstance(completed_agents, list) else set()
+    # Check document status with a single membership test rather than building a set
+    completed_agents = status_row.get("completed_agents") or []
+    is_completed = isinstance(completed_agents, list) and document_id in completed_agents
 
     path_value = files[document_id].get("path") if isinstance(files[document_id], dict) else files[document_id]
     content: Optional[str] = None
     
     # Try to get content from database first (preferred)
     try:
-        from src.context.shared_context import AgentType
-        agent_type = None
-        try:
-            agent_type = AgentType(document_id)
-        except ValueError:
-            pass
+        agent_type = AGENT_TYPES_BY_VALUE.get(document_id)
         
         if agent_type:
-            agent_output = cm.get_agent_output(project_id, agent_type)
+            agent_output = await run_in_threadpool(cm.get_agent_output, project_id, agent_type)
             if agent_output:
                 content = agent_output.content
         else:
             # Try to find by document_type directly
-            content = cm.get_document_content_by_type(project_id, document_id)
+            content = await run_in_threadpool(cm.get_document_content_by_type, project_id, document_id)
     except Exception as exc:
         logger.warning("Failed to read document %s from database: %s", document_id, exc)
     
@@ -581,13 +710,13 @@ async def get_single_document(
         except OSError as exc:
             logger.warning("Failed to read document %s at %s: %s", document_id, path_value, exc)
 
-    return GeneratedDocument(
+    return _json_response(GeneratedDocument.model_construct(
         id=document_id,
-        name=catalog_doc.name if catalog_doc else document_id,
-        status="complete" if document_id in completed_agents_set else "pending",
+        name=get_document_names().get(document_id, document_id),
+        status="complete" if is_completed else "pending",
         file_path=path_value if isinstance(path_value, str) else None,
         content=content,
-    )
+    ), request=request)
 
 
 @router.get("/{project_id}/documents/{document_id}/download")
@@ -597,12 +726,13 @@ async def download_document(
     project_id: str,
     document_id: str,
     cm: ContextManagerDep
-) -> FileResponse:
+) -> StreamingResponse:
     """
     Download a generated document as a file.
     
-    Returns the document file with appropriate headers for download.
-    The file is served as text/markdown with Content-Disposition header.
+    Streams the latest document content from the database as text/markdown
+    with a Content-Disposition header, encoding it chunk by chunk so the
+    whole document is never held twice.
     
     Args:
         request: FastAPI request object
@@ -610,42 +740,36 @@ async def download_document(
         document_id: Document identifier
     
     Returns:
-        FileResponse with the document file
+        StreamingResponse with the document content
     
     Raises:
-        HTTPException: 400 if IDs invalid, 404 if file not found on disk
+        HTTPException: 400 if IDs invalid, 404 if project or document content not found
     """
     # Validate IDs
-    if not project_id or not project_id.startswith("project_") or len(project_id) > 255:
-        raise HTTPException(status_code=400, detail="Invalid project ID format.")
+    _validate_project_id(project_id)
     if not document_id or len(document_id) > 255:
         raise HTTPException(status_code=400, detail="Invalid document ID format.")
     
-    document = await get_single_document(request, project_id, document_id)
-    
-    # Content is stored in database, not in files
-    if not document.content:
+    # Content is stored in database, not in files; resolve project and content in one query
+    output = await run_in_threadpool(cm.get_document_for_download, project_id, document_id)
+    if output is None:
+        raise HTTPException(status_code=404, detail="Project not found.")
+    if output["content"] is None:
         raise HTTPException(status_code=404, detail="Document content not found.")
     
     # Generate filename from document type (sanitize for filename)
-    import re
-    safe_name = re.sub(r'[^\w\s-]', '', document.name or document_id)
-    safe_name = re.sub(r'[-\s]+', '-', safe_name)
+    doc_name = get_document_names().get(document_id, document_id)
+    safe_name = _FILENAME_DASH_RE.sub('-', _FILENAME_STRIP_RE.sub('', doc_name))
     filename = f"{safe_name}.md"
     
-    # Return content as file download (from database)
-    from fastapi.responses import Response
-    import urllib.parse
     # URL encode filename for Content-Disposition header
     encoded_filename = urllib.parse.quote(filename)
     
-    return Response(
-        content=document.content.encode('utf-8'),
+    return StreamingResponse(
+        cm.iter_document_content_bytes(output["content"]),
         media_type="text/markdown",
         headers={
             "Content-Disposition": f'attachment; filename="{filename}"; filename*=UTF-8\'\'{encoded_filename}',
             "Content-Type": "text/markdown; charset=utf-8",
-            "Content-Length": str(len(document.content.encode('utf-8')))
         }
     )
-
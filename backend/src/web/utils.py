@@ -1,50 +1,41 @@
 """
 Utility functions for web application.
 
-This module provides helper functions used across the web API,
-including JSON parsing utilities and common data transformations.
+This module provides helpers used across the web API: project ID
+validation and the orjson-backed JSON response class.
 """
 from __future__ import annotations
 
-import json
+import re
 from typing import Any
 
-from src.utils.logger import get_logger
+import orjson
+from fastapi.responses import JSONResponse
 
-logger = get_logger(__name__)
+# project_YYYYMMDD_HHMMSS_<8 hex chars>, as generated on project creation
+PROJECT_ID_RE = re.compile(r"project_[0-9]{8}_[0-9]{6}_[0-9a-f]{8}")
 
 
-def parse_json_field(value: Any, default: Any = None) -> Any:
+def is_valid_project_id(project_id: Any) -> bool:
     """
-    Parse a JSON field that may be a string, list, dict, or already parsed.
-    
-    This function handles the common case where database fields may store
-    JSON as strings (from older migrations) or as already-parsed objects.
+    Check that a project ID matches the format generated on project creation.
     
     Args:
-        value: The value to parse (can be str, list, dict, or None)
-        default: Default value to return if parsing fails or value is None
+        project_id: Project identifier from the request path
         
     Returns:
-        Parsed value or default. If value is a string, attempts JSON parsing.
-        If parsing fails, returns default. If value is already a dict/list,
-        returns it as-is.
-    
-    Example:
-        >>> parse_json_field('["a", "b"]')  # Returns: ["a", "b"]
-        >>> parse_json_field(["a", "b"])   # Returns: ["a", "b"]
-        >>> parse_json_field(None)          # Returns: None (or default)
-        >>> parse_json_field("invalid")     # Returns: None (or default)
+        True if the ID is well-formed
     """
-    if value is None:
-        return default
-    
-    if isinstance(value, str):
-        try:
-            return json.loads(value)
-        except json.JSONDecodeError:
-            logger.warning("Failed to parse JSON field: %s", value[:100] if len(str(value)) > 100 else value)
-            return default
+    return isinstance(project_id, str) and PROJECT_ID_RE.fullmatch(project_id) is not None
+
+
+class OrjsonResponse(JSONResponse):
+    """
+    JSON response serialized with orjson instead of the stdlib json module.
     
-    return value
+    Defined here rather than using fastapi.responses.ORJSONResponse, which
+    recent FastAPI releases deprecate.
+    """
 
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
@@ -2,21 +2,64 @@
 from __future__ import annotations
 
 import asyncio
-import json
 import os
 import ssl
+import time
+from collections import deque
+from contextlib import asynccontextmanager
 from datetime import datetime
-from typing import Any, Dict, List, Set, Optional
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional
 from urllib.parse import urlparse
 
 from fastapi import WebSocket
+import orjson
 import redis.asyncio as redis
 
 from src.utils.logger import get_logger
+from src.utils.redis_client import get_redis_pool
 
 logger = get_logger(__name__)
 
 
+# Message timestamps have second resolution, so the ISO string for the current
+# second is formatted once and shared by every message sent within it
+_iso_cache: List[Any] = [0, ""]
+
+
+def now_iso() -> str:
+    """Return the current local time as an ISO 8601 string (second resolution)"""
+    second = int(time.time())
+    if _iso_cache[0] != second:
+        _iso_cache[1] = datetime.fromtimestamp(second).isoformat()
+        _iso_cache[0] = second
+    return _iso_cache[1]
+
+
+async def send_json_text(websocket: WebSocket, payload: Dict[str, Any]) -> None:
+    """
+    Send a JSON text frame serialized with orjson.
+    
+    Equivalent to websocket.send_json() (clients JSON.parse text frames) but
+    avoids the stdlib json encoder.
+    """
+    await websocket.send_text(orjson.dumps(payload).decode("utf-8"))
+
+
+class ConnectionEntry:
+    """
+    A project's WebSocket connection.
+    
+    Owns the outgoing queue drained by the connection's writer task. Liveness
+    is left to protocol-level PING/PONG frames sent by the server.
+    """
+    __slots__ = ("ws", "queue", "writer")
+
+    def __init__(self, ws: WebSocket, max_queue_size: int) -> None:
+        self.ws = ws
+        self.queue: asyncio.Queue[str] = asyncio.Queue(maxsize=max_queue_size)
+        self.writer: Optional[asyncio.Task] = None
+
+
 class WebSocketManager:
     """
     Manage WebSocket connections per project with Redis Pub/Sub support.
@@ -28,19 +71,29 @@ class WebSocketManager:
     Features:
     - Redis Pub/Sub for cross-process messaging
     - Per-project connection tracking
+    - A writer task per connection, so broadcasts only enqueue
     - Automatic cleanup of disconnected clients
     - Message queue for disconnected clients
     """
+    __slots__ = (
+        "active_connections", "message_queue", "_locks", "_lock_users",
+        "max_connections_per_project", "max_queue_size",
+        "redis_client", "pubsub", "redis_task",
+    )
     
-    def __init__(self, max_connections_per_project: int = 5, max_queue_size: int = 100, 
-                 heartbeat_interval: int = 30, heartbeat_timeout: int = 60) -> None:
-        self.active_connections: Dict[str, Set[WebSocket]] = {}
-        self.message_queue: Dict[str, List[Dict[str, Any]]] = {}
-        self.connection_last_pong: Dict[WebSocket, float] = {}
+    def __init__(self, max_connections_per_project: int = 5, max_queue_size: int = 100) -> None:
+        # Connections per project, kept in a list: broadcasts iterate them far more
+        # often than they are added or removed, and there are only a few per project
+        self.active_connections: Dict[str, List[ConnectionEntry]] = {}
+        # Queued messages are kept serialized, ready to send as text frames; each
+        # queue is bounded and drops its oldest message when full
+        self.message_queue: Dict[str, Deque[str]] = {}
+        # Per-project locks guarding connection registration against broadcasts
+        self._locks: Dict[str, asyncio.Lock] = {}
+        # Coroutines holding or waiting for each project's lock
+        self._lock_users: Dict[str, int] = {}
         self.max_connections_per_project = max_connections_per_project
         self.max_queue_size = max_queue_size
-        self.heartbeat_interval = heartbeat_interval
-        self.heartbeat_timeout = heartbeat_timeout
         
         self.redis_client: Optional[redis.Redis] = None
         self.pubsub = None
@@ -48,8 +101,6 @@ class WebSocketManager:
 
     async def connect_redis(self) -> None:
         """Initialize Redis connection and start listener with fallback"""
-        from src.utils.redis_client import get_redis_pool
-        
         redis_pool = get_redis_pool()
         
         if not redis_pool:
@@ -71,7 +122,7 @@ class WebSocketManager:
             self.redis_task = asyncio.create_task(self._redis_listener())
             
         except Exception as e:
-            logger.warning(f"⚠️ WebSocket Manager failed to connect to Redis: {e}. Falling back to local-only mode.")
+            logger.warning("⚠️ WebSocket Manager failed to connect to Redis: %s. Falling back to local-only mode.", e)
             logger.warning("Frontend will receive updates via polling fallback.")
             self.redis_client = None
 
@@ -84,17 +135,20 @@ class WebSocketManager:
                         channel = message["channel"]
                         # Channel format: projects:{project_id}:events
                         project_id = channel.split(":")[1]
-                        payload = json.loads(message["data"])
                         
-                        # Broadcast to local connections for this project
-                        await self._broadcast_local(project_id, payload)
+                        # Published payloads are already JSON; forward them as-is
+                        await self._broadcast_text(project_id, message["data"])
                     except Exception as e:
-                        logger.error(f"Error processing Redis message: {e}")
+                        logger.error("Error processing Redis message: %s", e)
         except Exception as e:
-            logger.error(f"Redis listener error: {e}")
+            logger.error("Redis listener error: %s", e)
 
     async def shutdown(self):
         """Cleanup resources"""
+        for connections in self.active_connections.values():
+            for entry in connections:
+                if entry.writer is not None:
+                    entry.writer.cancel()
         if self.pubsub:
             await self.pubsub.unsubscribe()
         if self.redis_task:
@@ -102,34 +156,107 @@ class WebSocketManager:
         if self.redis_client:
             await self.redis_client.close()
 
-    async def connect(self, websocket: WebSocket, project_id: str) -> None:
-        """Connect a WebSocket to a project."""
-        connections = self.active_connections.get(project_id, set())
-        if len(connections) >= self.max_connections_per_project:
-            await websocket.close(code=1008, reason="Too many connections")
-            return
-        
-        await websocket.accept()
-        self.active_connections.setdefault(project_id, set()).add(websocket)
+    def _lock_for(self, project_id: str) -> asyncio.Lock:
+        """Return the lock for a project, creating it on first use"""
+        lock = self._locks.get(project_id)
+        if lock is None:
+            lock = self._locks[project_id] = asyncio.Lock()
+        return lock
+
+    @asynccontextmanager
+    async def _project_lock(self, project_id: str) -> AsyncIterator[None]:
+        """
+        Hold a project's lock, counting the caller as a user while it waits and holds it.
         
-        import time
-        self.connection_last_pong[websocket] = time.time()
+        A released lock may still have a woken waiter that has not run yet, so the
+        lock is only dropped once the last user leaves; dropping it earlier would
+        let a new lock admit a second holder.
+        """
+        lock = self._lock_for(project_id)
+        self._lock_users[project_id] = self._lock_users.get(project_id, 0) + 1
+        try:
+            async with lock:
+                yield
+        finally:
+            users = self._lock_users[project_id] - 1
+            if users:
+                self._lock_users[project_id] = users
+            else:
+                del self._lock_users[project_id]
+                self._drop_idle_lock(project_id)
+
+    def _drop_idle_lock(self, project_id: str) -> None:
+        """Forget a project's lock once it has no connections and nobody holds or awaits it"""
+        if project_id not in self.active_connections and project_id not in self._lock_users:
+            self._locks.pop(project_id, None)
+
+    async def connect(self, websocket: WebSocket, project_id: str) -> Optional[ConnectionEntry]:
+        """
+        Connect a WebSocket to a project.
         
-        # Send queued messages
-        if project_id in self.message_queue and self.message_queue[project_id]:
-            queued = self.message_queue[project_id]
-            for msg in queued:
-                await websocket.send_json(msg)
-            del self.message_queue[project_id]
+        Returns the connection's entry, or None if the project is at its
+        connection limit and the WebSocket was closed. Holds the project lock
+        while checking the limit, accepting and handing queued messages to the
+        connection's writer, so concurrent connects cannot exceed the limit and
+        queued messages reach the client before later broadcasts. The
+        "connected" frame is sent before the writer starts, so it is always
+        the first frame the client receives.
+        """
+        async with self._project_lock(project_id):
+            # One lookup; the list is only created once the connection is
+            # registered, so a failed accept or send leaves no empty entry behind
+            connections = self.active_connections.get(project_id)
+            if connections is not None and len(connections) >= self.max_connections_per_project:
+                await websocket.close(code=1008, reason="Too many connections")
+                return None
+            
+            await websocket.accept()
+            entry = next((e for e in connections or () if e.ws is websocket), None)
+            if entry is None:
+                await send_json_text(websocket, {
+                    "type": "connected",
+                    "message": "WebSocket connected",
+                    "project_id": project_id,
+                    "timestamp": now_iso(),
+                })
+                entry = ConnectionEntry(websocket, self.max_queue_size)
+                entry.writer = asyncio.create_task(self._writer(entry, project_id))
+                if connections is None:
+                    connections = self.active_connections[project_id] = []
+                connections.append(entry)
+            
+            # Queued messages go out first; the writer has not run yet, so it
+            # picks them all up together and sends them as one replay frame
+            queued = self.message_queue.pop(project_id, None)
+            if queued:
+                for data in queued:
+                    entry.queue.put_nowait(data)
+            return entry
 
     def disconnect(self, websocket: WebSocket, project_id: str) -> None:
         """Disconnect a WebSocket."""
         connections = self.active_connections.get(project_id)
         if connections:
-            connections.discard(websocket)
+            for index, entry in enumerate(connections):
+                if entry.ws is websocket:
+                    del connections[index]
+                    if entry.writer is not None:
+                        entry.writer.cancel()
+                    break
             if not connections:
                 self.active_connections.pop(project_id, None)
-        self.connection_last_pong.pop(websocket, None)
+                self._drop_idle_lock(project_id)
+
+    def _remove_entries(self, project_id: str, connections: List[ConnectionEntry],
+                        removed: List[ConnectionEntry]) -> None:
+        """Drop several entries from a project's connection list in one pass (caller holds the lock)"""
+        removed_set = set(removed)
+        for entry in removed_set:
+            if entry.writer is not None:
+                entry.writer.cancel()
+        connections[:] = [entry for entry in connections if entry not in removed_set]
+        if not connections:
+            self.active_connections.pop(project_id, None)
 
     async def send_progress(self, project_id: str, message: Dict[str, Any]) -> None:
         """
@@ -138,9 +265,9 @@ class WebSocketManager:
         If Redis is available and within rate limits, publish to Redis.
         If Redis is rate-limited or unavailable, broadcast locally directly.
         """
-        from src.utils.redis_client import get_redis_pool
-        
-        payload = {**message, "timestamp": datetime.now().isoformat()}
+        payload = {**message, "timestamp": now_iso()}
+        # Serialized once for whichever path delivers it
+        data = orjson.dumps(payload)
         
         redis_pool = get_redis_pool()
         
@@ -152,44 +279,79 @@ class WebSocketManager:
                 if can_make:
                     await self.redis_client.publish(
                         f"projects:{project_id}:events",
-                        json.dumps(payload)
+                        data
                     )
                     redis_pool.record_request()
                     return
                 else:
-                    logger.debug(f"Redis rate limit reached for WebSocket: {error_msg}. Using local broadcast.")
+                    logger.debug("Redis rate limit reached for WebSocket: %s. Using local broadcast.", error_msg)
                     # Fall through to local broadcast
             except Exception as e:
-                logger.debug(f"Failed to publish to Redis: {e}. Using local broadcast.")
+                logger.debug("Failed to publish to Redis: %s. Using local broadcast.", e)
         
         # Fallback to local broadcast if Redis failed, not configured, or rate-limited
-        await self._broadcast_local(project_id, payload)
+        try:
+            await self._broadcast_text(project_id, data.decode("utf-8"))
+        except Exception as e:
+            logger.error("Failed to broadcast progress for project %s: %s", project_id, e)
 
-    async def _broadcast_local(self, project_id: str, payload: Dict[str, Any]) -> None:
-        """Send to locally connected clients"""
-        connections = self.active_connections.get(project_id)
-        
-        if not connections:
-            # Queue message if no active connections (local only)
-            # Note: With Redis, we might rely on persistence there, but for now simple queuing
-            if project_id not in self.message_queue:
-                self.message_queue[project_id] = []
+    async def _broadcast_text(self, project_id: str, data: str) -> None:
+        """Hand an already serialized JSON message to locally connected clients"""
+        # Only enqueue here; each connection's writer task does the sending, so
+        # a slow client never delays the broadcaster or the other clients
+        async with self._project_lock(project_id):
+            targets = self.active_connections.get(project_id)
+            if not targets:
+                # Queue message if no active connections (local only)
+                # Note: With Redis, we might rely on persistence there, but for now simple queuing
+                queue = self.message_queue.get(project_id)
+                if queue is None:
+                    queue = self.message_queue[project_id] = deque(maxlen=self.max_queue_size)
+                queue.append(data)
+                return
             
-            queue = self.message_queue[project_id]
-            if len(queue) >= self.max_queue_size:
-                queue.pop(0)
-            queue.append(payload)
-            return
+            overflowed = []
+            for entry in targets:
+                try:
+                    entry.queue.put_nowait(data)
+                except asyncio.QueueFull:
+                    overflowed.append(entry)
+            # A client too far behind to keep up is dropped so it reconnects
+            if overflowed:
+                self._remove_entries(project_id, targets, overflowed)
+        
+        if overflowed:
+            await asyncio.gather(
+                *(entry.ws.close(code=1013, reason="Client too slow") for entry in overflowed),
+                return_exceptions=True,
+            )
 
-        disconnected = set()
-        for connection in connections:
+    async def _writer(self, entry: ConnectionEntry, project_id: str) -> None:
+        """
+        Send a connection's queued messages until it disconnects.
+        
+        Messages that piled up while the previous send was in flight are merged
+        into a single replay frame (the client unpacks it like any replay).
+        """
+        queue = entry.queue
+        while True:
+            batch = [await queue.get()]
+            while not queue.empty():
+                batch.append(queue.get_nowait())
             try:
-                await connection.send_json(payload)
+                if len(batch) == 1:
+                    await entry.ws.send_text(batch[0])
+                else:
+                    await entry.ws.send_text('{"type":"replay","messages":[' + ",".join(batch) + "]}")
+            except asyncio.CancelledError:
+                raise
             except Exception:
-                disconnected.add(connection)
-        
-        for connection in disconnected:
-            self.disconnect(connection, project_id)
+                async with self._project_lock(project_id):
+                    self.disconnect(entry.ws, project_id)
+                return
+            finally:
+                for _ in batch:
+                    queue.task_done()
 
     # ... keep existing helper methods like get_queue_size, etc. ...
     def get_queue_size(self, project_id: str) -> int:
@@ -200,72 +362,18 @@ class WebSocketManager:
             del self.message_queue[project_id]
 
     def get_connection_count(self, project_id: str) -> int:
-        return len(self.active_connections.get(project_id, set()))
+        return len(self.active_connections.get(project_id, ()))
 
-    async def send_ping(self, websocket: WebSocket) -> bool:
-        try:
-            await websocket.send_json({
-                "type": "ping",
-                "timestamp": datetime.now().isoformat()
-            })
-            return True
-        except Exception:
-            return False
-
-    def record_pong(self, websocket: WebSocket) -> None:
-        import time
-        self.connection_last_pong[websocket] = time.time()
-
-    async def check_connection_health(self, websocket: WebSocket, project_id: str) -> bool:
-        """
-        Check if WebSocket connection is healthy.
-        
-        More resilient - allows for temporary network hiccups.
-        Returns True if connection is healthy, False otherwise.
-        """
-        try:
-            import time
-            # Check if connection is still in active connections
-            connections = self.active_connections.get(project_id, set())
-            if websocket not in connections:
-                logger.debug(f"Connection not found in active connections for project {project_id}")
-                return False
-            
-            current_time = time.time()
-            # Default to current time if never ponged (new connection)
-            last_pong = self.connection_last_pong.get(websocket, current_time)
-            time_since_pong = current_time - last_pong
-            
-            # Use 2x heartbeat timeout for more lenient health check
-            # This handles temporary network hiccups better
-            max_allowed = self.heartbeat_timeout * 2
-            
-            if time_since_pong > max_allowed:
-                logger.debug(
-                    f"Connection unhealthy for project {project_id}: "
-                    f"last pong {time_since_pong:.1f}s ago (max: {max_allowed}s)"
-                )
-                return False
-            
-            return True
-        except Exception as e:
-            # Be lenient on health check errors - assume healthy if we can't check
-            logger.debug(f"Error checking connection health (non-fatal): {e}")
-            return True
-
-    async def cleanup_dead_connections(self, project_id: str) -> int:
-        connections = self.active_connections.get(project_id, set())
-        dead = []
-        for ws in list(connections):
-            if not await self.check_connection_health(ws, project_id):
-                dead.append(ws)
-        for ws in dead:
-            try:
-                await ws.close(code=1001)
-            except:
-                pass
-            self.disconnect(ws, project_id)
-        return len(dead)
-
-# Global instance
-websocket_manager = WebSocketManager()
+
+# Global instance, created on first access so importing this module (e.g. for
+# send_json_text) does not build a manager that is never used
+_websocket_manager: Optional[WebSocketManager] = None
+
+
+def __getattr__(name: str) -> Any:
+    global _websocket_manager
+    if name == "websocket_manager":
+        if _websocket_manager is None:
+            _websocket_manager = WebSocketManager()
+        return _websocket_manager
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
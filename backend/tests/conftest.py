@@ -13,6 +13,21 @@ os.environ.setdefault("DATABASE_URL", "postgresql://localhost/omnidoc_test")
 os.environ.setdefault("ALLOWED_ORIGINS", "http://localhost:3000")
 
 
+@pytest.fixture(scope="session", autouse=True)
+def _warm_converter_imports():
+    """Import the converter's lazily loaded libraries once at session start
+
+    FormatConverterAgent imports markdown, python-docx and weasyprint inside its
+    methods, so without this the first conversion test pays for them.
+    """
+    import importlib
+    for module in ("markdown", "docx", "weasyprint"):
+        try:
+            importlib.import_module(module)
+        except (ImportError, OSError):
+            pass  # Optional; weasyprint raises OSError without its system libraries
+
+
 @pytest.fixture(scope="session")
 def test_client():
     """Create a test client for the FastAPI app"""
@@ -41,35 +56,61 @@ def test_project_id():
     return f"test_project_{uuid.uuid4().hex[:8]}"
 
 
-@pytest.fixture
-def context_manager():
-    """Create a ContextManager instance for testing"""
+@pytest.fixture(scope="session")
+def _database_error():
+    """Probe the test database once per session; return why it is unreachable, or None
+
+    Connecting retries before giving up, so probing per test made every
+    database test wait ~1.5s just to skip when no database is running.
+    """
     from src.context.context_manager import ContextManager
-    # Use test database URL from environment
     db_url = os.getenv("DATABASE_URL", "postgresql://localhost/omnidoc_test")
     try:
         cm = ContextManager(db_url=db_url)
-        # Test connection by trying to get a connection
         try:
             conn = cm._get_connection()
             cm._put_connection(conn)
-        except Exception as e:
-            # Database not available - skip tests that need it
-            pytest.skip(f"Database not available: {e}")
+        finally:
+            cm.close()
+    except Exception as e:
+        return e
+    return None
+
+
+@pytest.fixture
+def context_manager(_database_error):
+    """Create a ContextManager instance for testing"""
+    from src.context.context_manager import ContextManager
+    if _database_error is not None:
+        # Database not available - skip tests that need it
+        pytest.skip(f"Database not available: {_database_error}")
+    # Use test database URL from environment
+    db_url = os.getenv("DATABASE_URL", "postgresql://localhost/omnidoc_test")
+    try:
+        cm = ContextManager(db_url=db_url)
         yield cm
     except Exception as e:
         # If database is not available, skip the test
         pytest.skip(f"Database not available: {e}")
 
 
-@pytest.fixture
-def rate_limiter():
-    """Create a RequestQueue instance for testing"""
+@pytest.fixture(scope="session")
+def _session_rate_limiter():
+    """Create one RequestQueue for the whole test session"""
     from src.rate_limit.queue_manager import RequestQueue
     # Use high limits for testing to avoid rate limiting during tests
     return RequestQueue(max_rate=1000, period=60, safety_margin=0.9)
 
 
+@pytest.fixture
+def rate_limiter(_session_rate_limiter):
+    """Return the shared RequestQueue with its window and cache cleared"""
+    with _session_rate_limiter.lock:
+        _session_rate_limiter.request_times.clear()
+        _session_rate_limiter.cache.clear()
+    return _session_rate_limiter
+
+
 @pytest.fixture
 def api_key_available():
     """Check if API key is available for testing"""
@@ -84,19 +125,28 @@ def api_key_available():
     }
 
 
-@pytest.fixture
-def mock_llm_provider():
-    """Create a mock LLM provider for testing"""
+@pytest.fixture(scope="session")
+def _session_mock_llm_provider():
+    """Create one mock LLM provider for the whole test session"""
     from unittest.mock import Mock, AsyncMock
-    provider = Mock()
+    from src.llm.base_provider import BaseLLMProvider
+    # Specced so agents calling a method the providers lack fail loudly
+    provider = Mock(spec=BaseLLMProvider)
     provider.generate_text = Mock(return_value="# Test Document\n\nThis is test content.")
     provider.generate_async = AsyncMock(return_value="# Test Document\n\nThis is test content.")
     provider.async_generate_text = AsyncMock(return_value="# Test Document\n\nThis is test content.")
     return provider
 
 
+@pytest.fixture
+def mock_llm_provider(_session_mock_llm_provider):
+    """Return the shared mock LLM provider with its recorded calls cleared"""
+    _session_mock_llm_provider.reset_mock()
+    return _session_mock_llm_provider
+
+
 @pytest.fixture
 def file_manager(temp_dir):
-    """Create a FileManager instance for testing"""
+    """Create a FileManager instance for testing (per test, so each gets an empty directory)"""
     from src.utils.file_manager import FileManager
     return FileManager(base_dir=str(temp_dir))
@@ -0,0 +1,82 @@
+"""
+In-memory stand-ins shared by tests
+Kept out of test modules so importing one does not pull in another test module's imports
+"""
+from types import SimpleNamespace
+
+
+class FakeContextManager:
+    """Minimal stand-in for ContextManager backed by dictionaries"""
+
+    def __init__(self):
+        self.statuses = {}
+        self.contents = {}
+        self.content_lookups = []
+        self.page_queries = []
+        self.writes = 0
+
+    def create_project(self, project_id, user_idea):
+        self.statuses[project_id] = {"project_id": project_id, "user_idea": user_idea}
+        self.touch(project_id)
+
+    def update_project_status(self, project_id, **kwargs):
+        self.statuses.setdefault(project_id, {"project_id": project_id}).update(kwargs)
+        self.touch(project_id)
+
+    def touch(self, project_id):
+        """Move updated_at, as every ContextManager write does"""
+        self.writes += 1
+        self.statuses[project_id]["updated_at"] = f"2024-01-01T12:00:{self.writes:02d}"
+
+    def get_project_updated_at(self, project_id):
+        status = self.statuses.get(project_id)
+        return status.get("updated_at") if status is not None else None
+
+    def get_project_status(self, project_id):
+        return self.statuses.get(project_id)
+
+    def get_project_status_lite(self, project_id):
+        status = self.statuses.get(project_id)
+        if status is None:
+            return None
+        return {key: status.get(key) for key in ("status", "completed_agents", "selected_documents", "error", "updated_at")}
+
+    def get_agent_output(self, project_id, agent_type):
+        self.content_lookups.append(agent_type.value)
+        content = self.contents.get((project_id, agent_type.value))
+        return SimpleNamespace(content=content) if content is not None else None
+
+    def get_document_content_by_type(self, project_id, document_type):
+        self.content_lookups.append(document_type)
+        return self.contents.get((project_id, document_type))
+
+    def get_document_for_download(self, project_id, document_type):
+        if project_id not in self.statuses:
+            return None
+        return {"content": self.contents.get((project_id, document_type))}
+
+    @staticmethod
+    def iter_document_content_bytes(content, chunk_size=4):
+        for start in range(0, len(content), chunk_size):
+            yield content[start:start + chunk_size].encode("utf-8")
+
+    def get_project_documents_page(self, project_id, limit, offset=0, include_content=False, after_position=None):
+        self.page_queries.append((limit, offset, include_content))
+        status = self.statuses.get(project_id)
+        if status is None:
+            return None
+        if after_position is not None:
+            offset = after_position + 1
+        files = list(enumerate(status.get("results", {}).get("files", {}).items()))[offset:offset + limit]
+        return {
+            "files": [
+                {
+                    "doc_id": doc_id,
+                    "position": position,
+                    "completed": doc_id in status.get("completed_agents", []),
+                    "file_path": file_path.get("path") if isinstance(file_path, dict) else file_path,
+                    "content": self.contents.get((project_id, doc_id)) if include_content else None,
+                }
+                for position, (doc_id, file_path) in files
+            ],
+        }
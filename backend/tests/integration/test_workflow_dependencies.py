@@ -4,24 +4,54 @@ Tests the improved workflow with:
 - technical_doc and database_schema in Phase 2 for parallel execution
 - business_model and marketing_plan in Phase 1 for quick decision-making
 """
+import inspect
+from unittest.mock import Mock
+
 import pytest
+from prompts.system_prompts import get_api_prompt, get_setup_guide_prompt
 from src.coordination.workflow_dag import (
     get_phase2_tasks_for_profile,
     build_task_dependencies,
+    build_kwargs_for_task,
     PHASE2_TASKS_CONFIG,
     Phase2Task
 )
 from src.context.shared_context import AgentType
 
 
+@pytest.fixture(scope="module")
+def phase2():
+    """Phase 2+ tasks and dependency maps per profile, built once for the module"""
+    team_tasks = get_phase2_tasks_for_profile(profile="team")
+    individual_tasks = get_phase2_tasks_for_profile(profile="individual")
+    return {
+        "team_tasks": team_tasks,
+        "individual_tasks": individual_tasks,
+        "team_dep_map": build_task_dependencies(team_tasks),
+        "individual_dep_map": build_task_dependencies(individual_tasks),
+    }
+
+
+@pytest.fixture(scope="module")
+def kwargs_inputs():
+    """Coordinator, context manager and summaries shared by the kwargs builder tests"""
+    return {
+        "coordinator": Mock(),
+        "context_manager": Mock(),
+        "req_summary": {"project_overview": "Test project"},
+        "technical_summary": "Technical doc content",
+    }
+
+
 @pytest.mark.integration
+@pytest.mark.xdist_group("workflow_dag")
 class TestWorkflowDependencies:
     """Test workflow dependency structure after improvements"""
     
-    def test_database_schema_in_phase2(self):
+    def test_database_schema_in_phase2(self, phase2):
         """Test that database_schema IS in Phase 2 tasks (moved from Phase 1 for parallel execution)"""
-        team_tasks = get_phase2_tasks_for_profile(profile="team")
-        individual_tasks = get_phase2_tasks_for_profile(profile="individual")
+        team_tasks = phase2["team_tasks"]
+        individual_tasks = phase2["individual_tasks"]
         
         # Database schema should BE in Phase 2 (moved for parallel execution)
         team_task_types = [task.agent_type for task in team_tasks]
@@ -33,39 +63,30 @@ class TestWorkflowDependencies:
         # Verify database_schema is in PHASE2_TASKS_CONFIG
         assert "database_schema" in PHASE2_TASKS_CONFIG
     
-    def test_api_doc_depends_on_database_schema(self):
-        """Test that api_doc depends on database_schema"""
-        api_doc_task = PHASE2_TASKS_CONFIG.get("api_doc")
-        
-        assert api_doc_task is not None
-        assert api_doc_task.agent_type == AgentType.API_DOCUMENTATION
-        
+    @pytest.mark.parametrize("task_id,agent_type,required_deps,kwargs_builder", [
         # api_doc should depend on TECHNICAL_DOCUMENTATION and DATABASE_SCHEMA
-        assert AgentType.TECHNICAL_DOCUMENTATION in api_doc_task.dependencies
-        assert AgentType.DATABASE_SCHEMA in api_doc_task.dependencies
-        
-        # Should use with_db_schema kwargs_builder
-        assert api_doc_task.kwargs_builder == "with_db_schema"
-    
-    def test_setup_guide_depends_on_database_schema(self):
-        """Test that setup_guide depends on database_schema"""
-        setup_guide_task = PHASE2_TASKS_CONFIG.get("setup_guide")
-        
-        assert setup_guide_task is not None
-        assert setup_guide_task.agent_type == AgentType.SETUP_GUIDE
-        
+        ("api_doc", AgentType.API_DOCUMENTATION,
+         {AgentType.TECHNICAL_DOCUMENTATION, AgentType.DATABASE_SCHEMA}, "with_db_schema"),
         # setup_guide should depend on API_DOCUMENTATION, TECHNICAL_DOCUMENTATION, and DATABASE_SCHEMA
-        assert AgentType.API_DOCUMENTATION in setup_guide_task.dependencies
-        assert AgentType.TECHNICAL_DOCUMENTATION in setup_guide_task.dependencies
-        assert AgentType.DATABASE_SCHEMA in setup_guide_task.dependencies
-        
-        # Should use with_api_and_db kwargs_builder
-        assert setup_guide_task.kwargs_builder == "with_api_and_db"
+        ("setup_guide", AgentType.SETUP_GUIDE,
+         {AgentType.API_DOCUMENTATION, AgentType.TECHNICAL_DOCUMENTATION, AgentType.DATABASE_SCHEMA},
+         "with_api_and_db"),
+        # database_schema is a Phase 2 task (moved from Phase 1 for parallel execution)
+        ("database_schema", AgentType.DATABASE_SCHEMA, set(), None),
+    ], ids=["api_doc", "setup_guide", "database_schema"])
+    def test_phase2_task_config(self, task_id, agent_type, required_deps, kwargs_builder):
+        """Test the agent type, dependencies and kwargs builder of Phase 2 tasks"""
+        task = PHASE2_TASKS_CONFIG.get(task_id)
+        
+        assert task is not None
+        assert task.agent_type == agent_type
+        assert required_deps <= set(task.dependencies)
+        if kwargs_builder is not None:
+            assert task.kwargs_builder == kwargs_builder
     
-    def test_phase2_dependencies_structure(self):
+    def test_phase2_dependencies_structure(self, phase2):
         """Test Phase 2 dependency structure"""
-        team_tasks = get_phase2_tasks_for_profile(profile="team")
-        dependency_map = build_task_dependencies(team_tasks)
+        dependency_map = phase2["team_dep_map"]
         
         # api_doc should have dependencies (but they're Phase 1, so empty list in dependency_map)
         # The actual dependencies are handled in coordinator by checking Phase 1 content
@@ -79,115 +100,53 @@ class TestWorkflowDependencies:
         dev_doc_deps = dependency_map.get("dev_doc", [])
         assert "api_doc" in dev_doc_deps
     
-    def test_database_schema_in_phase2_agent_types(self):
-        """Test that DATABASE_SCHEMA is now in Phase 2 (moved from Phase 1 for parallel execution)"""
-        from src.coordination.workflow_dag import build_task_dependencies
-        from src.coordination.workflow_dag import get_phase2_tasks_for_profile
-        
-        team_tasks = get_phase2_tasks_for_profile(profile="team")
-        
-        # Verify database_schema is now a Phase 2 task
-        team_task_types = [task.agent_type for task in team_tasks]
-        assert AgentType.DATABASE_SCHEMA in team_task_types
-        
-        # Verify api_doc depends on DATABASE_SCHEMA (which is now in Phase 2)
-        api_doc_task = PHASE2_TASKS_CONFIG.get("api_doc")
-        assert AgentType.DATABASE_SCHEMA in api_doc_task.dependencies
-        
-        # Verify database_schema task exists in Phase 2
-        database_schema_task = PHASE2_TASKS_CONFIG.get("database_schema")
-        assert database_schema_task is not None
-        assert database_schema_task.agent_type == AgentType.DATABASE_SCHEMA
-    
-    def test_kwargs_builder_with_db_schema(self):
-        """Test that with_db_schema kwargs_builder exists and works"""
-        from src.coordination.workflow_dag import build_kwargs_for_task
-        from unittest.mock import Mock
-        
-        # Create a mock coordinator
-        coordinator = Mock()
-        
-        # Create a task that uses with_db_schema
+    @pytest.mark.parametrize("agent_type,dependencies,kwargs_builder,deps_content,expected", [
+        (
+            AgentType.API_DOCUMENTATION,
+            [AgentType.TECHNICAL_DOCUMENTATION, AgentType.DATABASE_SCHEMA],
+            "with_db_schema",
+            {AgentType.DATABASE_SCHEMA: "Database schema content"},
+            {"database_schema_summary": "Database schema content"},
+        ),
+        (
+            AgentType.SETUP_GUIDE,
+            [AgentType.API_DOCUMENTATION, AgentType.TECHNICAL_DOCUMENTATION, AgentType.DATABASE_SCHEMA],
+            "with_api_and_db",
+            {
+                AgentType.API_DOCUMENTATION: "API doc content",
+                AgentType.DATABASE_SCHEMA: "Database schema content"
+            },
+            {"api_summary": "API doc content", "database_schema_summary": "Database schema content"},
+        ),
+    ], ids=["with_db_schema", "with_api_and_db"])
+    def test_kwargs_builder(self, kwargs_inputs, agent_type, dependencies, kwargs_builder,
+                            deps_content, expected):
+        """Test that the dependency-aware kwargs builders exist and pass dependency content through"""
         task = Phase2Task(
-            task_id="test_api",
-            agent_type=AgentType.API_DOCUMENTATION,
+            task_id=f"test_{kwargs_builder}",
+            agent_type=agent_type,
             output_filename="test.md",
-            dependencies=[AgentType.TECHNICAL_DOCUMENTATION, AgentType.DATABASE_SCHEMA],
-            kwargs_builder="with_db_schema"
+            dependencies=dependencies,
+            kwargs_builder=kwargs_builder
         )
         
-        # Test kwargs building
-        req_summary = {"project_overview": "Test project"}
-        technical_summary = "Technical doc content"
-        deps_content = {
-            AgentType.DATABASE_SCHEMA: "Database schema content"
-        }
-        
         kwargs = build_kwargs_for_task(
             task=task,
-            coordinator=coordinator,
-            req_summary=req_summary,
-            technical_summary=technical_summary,
             charter_content=None,
             project_id="test_project",
-            context_manager=Mock(),
-            deps_content=deps_content
+            deps_content=deps_content,
+            **kwargs_inputs
         )
         
-        # Verify kwargs contain database_schema_summary
-        assert "database_schema_summary" in kwargs
-        assert kwargs["database_schema_summary"] == "Database schema content"
-        assert kwargs["requirements_summary"] == req_summary
-        assert kwargs["technical_summary"] == technical_summary
+        for key, value in expected.items():
+            assert kwargs[key] == value
+        assert kwargs["requirements_summary"] == kwargs_inputs["req_summary"]
+        assert kwargs["technical_summary"] == kwargs_inputs["technical_summary"]
     
-    def test_kwargs_builder_with_api_and_db(self):
-        """Test that with_api_and_db kwargs_builder exists and works"""
-        from src.coordination.workflow_dag import build_kwargs_for_task
-        from unittest.mock import Mock
-        
-        # Create a mock coordinator
-        coordinator = Mock()
-        
-        # Create a task that uses with_api_and_db
-        task = Phase2Task(
-            task_id="test_setup",
-            agent_type=AgentType.SETUP_GUIDE,
-            output_filename="test.md",
-            dependencies=[AgentType.API_DOCUMENTATION, AgentType.TECHNICAL_DOCUMENTATION, AgentType.DATABASE_SCHEMA],
-            kwargs_builder="with_api_and_db"
-        )
-        
-        # Test kwargs building
-        req_summary = {"project_overview": "Test project"}
-        technical_summary = "Technical doc content"
-        deps_content = {
-            AgentType.API_DOCUMENTATION: "API doc content",
-            AgentType.DATABASE_SCHEMA: "Database schema content"
-        }
-        
-        kwargs = build_kwargs_for_task(
-            task=task,
-            coordinator=coordinator,
-            req_summary=req_summary,
-            technical_summary=technical_summary,
-            charter_content=None,
-            project_id="test_project",
-            context_manager=Mock(),
-            deps_content=deps_content
-        )
-        
-        # Verify kwargs contain both api_summary and database_schema_summary
-        assert "api_summary" in kwargs
-        assert "database_schema_summary" in kwargs
-        assert kwargs["api_summary"] == "API doc content"
-        assert kwargs["database_schema_summary"] == "Database schema content"
-        assert kwargs["requirements_summary"] == req_summary
-        assert kwargs["technical_summary"] == technical_summary
-    
-    def test_phase2_task_count(self):
+    def test_phase2_task_count(self, phase2):
         """Test that Phase 2+ has correct number of tasks"""
-        team_tasks = get_phase2_tasks_for_profile(profile="team")
-        individual_tasks = get_phase2_tasks_for_profile(profile="individual")
+        team_tasks = phase2["team_tasks"]
+        individual_tasks = phase2["individual_tasks"]
         
         # Team should have more tasks than individual (team has pm_doc and stakeholder_doc)
         assert len(team_tasks) >= len(individual_tasks)
@@ -203,9 +162,9 @@ class TestWorkflowDependencies:
         # Total: 9 tasks (Phase 2, 3, 4 combined, no team-only tasks)
         assert len(individual_tasks) == 9
     
-    def test_all_phase2_tasks_have_valid_agent_types(self):
+    def test_all_phase2_tasks_have_valid_agent_types(self, phase2):
         """Test that all Phase 2 tasks have valid agent types"""
-        team_tasks = get_phase2_tasks_for_profile(profile="team")
+        team_tasks = phase2["team_tasks"]
         
         valid_agent_types = set(AgentType)
         
@@ -215,12 +174,10 @@ class TestWorkflowDependencies:
             assert task.output_filename is not None
             assert task.kwargs_builder is not None
     
-    def test_dependency_consistency(self):
+    def test_dependency_consistency(self, phase2):
         """Test that dependencies are consistent across tasks"""
-        team_tasks = get_phase2_tasks_for_profile(profile="team")
-        
-        # Build dependency map
-        dependency_map = build_task_dependencies(team_tasks)
+        team_tasks = phase2["team_tasks"]
+        dependency_map = phase2["team_dep_map"]
         
         # Check that all dependencies reference valid tasks
         task_ids = {task.task_id for task in team_tasks}
@@ -237,7 +194,6 @@ class TestWorkflowDependencies:
     def test_api_agent_supports_database_schema_summary(self):
         """Test that API agent supports database_schema_summary parameter"""
         from src.agents.api_documentation_agent import APIDocumentationAgent
-        import inspect
         
         # Check generate method signature
         generate_sig = inspect.signature(APIDocumentationAgent.generate)
@@ -250,7 +206,6 @@ class TestWorkflowDependencies:
     def test_setup_guide_agent_supports_database_schema_summary(self):
         """Test that Setup Guide agent supports database_schema_summary parameter"""
         from src.agents.setup_guide_agent import SetupGuideAgent
-        import inspect
         
         # Check generate method signature
         generate_sig = inspect.signature(SetupGuideAgent.generate)
@@ -262,19 +217,21 @@ class TestWorkflowDependencies:
     
     def test_get_api_prompt_supports_database_schema_summary(self):
         """Test that get_api_prompt supports database_schema_summary parameter"""
-        from prompts.system_prompts import get_api_prompt
-        import inspect
-        
         # Check function signature
         sig = inspect.signature(get_api_prompt)
         assert "database_schema_summary" in sig.parameters
     
     def test_get_setup_guide_prompt_supports_database_schema_summary(self):
         """Test that get_setup_guide_prompt supports database_schema_summary parameter"""
-        from prompts.system_prompts import get_setup_guide_prompt
-        import inspect
-        
         # Check function signature
         sig = inspect.signature(get_setup_guide_prompt)
         assert "database_schema_summary" in sig.parameters
 
+    def test_phase2_tasks_cached_per_profile(self):
+        """Test that repeated lookups reuse the cached selection but return separate lists"""
+        first = get_phase2_tasks_for_profile(profile="team")
+        second = get_phase2_tasks_for_profile(profile="team")
+        
+        assert first == second
+        assert first is not second
+        assert all(a is b for a, b in zip(first, second))
@@ -58,7 +58,7 @@ def test_create_project_success():
 
 def test_get_project_status_not_found():
     """Test getting status for non-existent project"""
-    response = client.get("/api/projects/project_nonexistent_12345/status")
+    response = client.get("/api/projects/project_20000101_000000_00000000/status")
     assert response.status_code == 404
 
 
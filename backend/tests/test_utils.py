@@ -3,47 +3,24 @@ Tests for utility functions
 """
 import pytest
 
-from src.web.utils import parse_json_field
-
-
-def test_parse_json_field_string():
-    """Test parsing JSON string"""
-    result = parse_json_field('["a", "b"]')
-    assert result == ["a", "b"]
-
-
-def test_parse_json_field_already_parsed():
-    """Test parsing already parsed JSON"""
-    result = parse_json_field(["a", "b"])
-    assert result == ["a", "b"]
-
-
-def test_parse_json_field_none():
-    """Test parsing None value"""
-    result = parse_json_field(None)
-    assert result is None
-
-
-def test_parse_json_field_none_with_default():
-    """Test parsing None with default value"""
-    result = parse_json_field(None, default=[])
-    assert result == []
-
-
-def test_parse_json_field_invalid_json():
-    """Test parsing invalid JSON string"""
-    result = parse_json_field("invalid json")
-    assert result is None
-
-
-def test_parse_json_field_invalid_json_with_default():
-    """Test parsing invalid JSON with default value"""
-    result = parse_json_field("invalid json", default=[])
-    assert result == []
-
-
-def test_parse_json_field_dict():
-    """Test parsing dictionary"""
-    result = parse_json_field({"key": "value"})
-    assert result == {"key": "value"}
-
+from src.web.utils import OrjsonResponse, is_valid_project_id
+
+
+def test_is_valid_project_id():
+    """Test project ID format validation"""
+    assert is_valid_project_id("project_20240101_120000_abcdef12")
+    assert not is_valid_project_id("project_20240101_120000_abc123")
+    assert not is_valid_project_id("project_20240101_120000_abcdef123")
+    assert not is_valid_project_id("invalid_id")
+    assert not is_valid_project_id("project_nonexistent_12345")
+    assert not is_valid_project_id("project_20240101_120000_abcdef12/../x")
+    assert not is_valid_project_id("project_20240101_120000_abcdef12\n")
+    assert not is_valid_project_id("project_٢٠٢٤0101_120000_abcdef12")
+    assert not is_valid_project_id(None)
+
+
+def test_orjson_response_render():
+    """Test that OrjsonResponse renders compact JSON and non-string keys"""
+    response = OrjsonResponse({"files": {1: "readme.md"}, "name": "Résumé"})
+    assert response.body == '{"files":{"1":"readme.md"},"name":"Résumé"}'.encode("utf-8")
+    assert response.media_type == "application/json"
@@ -29,3 +29,31 @@ async def test_websocket_connection_valid():
         assert data["type"] == "connected"
         assert data["project_id"] == project_id
 
+
+
+def test_now_iso_second_resolution():
+    """Test that WebSocket timestamps are cached at second resolution"""
+    from datetime import datetime
+    from src.web.websocket_manager import now_iso
+
+    first = now_iso()
+    assert "." not in first
+    assert datetime.fromisoformat(first)
+
+
+def test_send_json_text_sends_text_frame():
+    """Test that JSON frames are sent as text so clients can JSON.parse them"""
+    import asyncio
+    from src.web.websocket_manager import send_json_text
+
+    class FakeWebSocket:
+        def __init__(self):
+            self.sent = []
+
+        async def send_text(self, data):
+            self.sent.append(data)
+
+    websocket = FakeWebSocket()
+    asyncio.run(send_json_text(websocket, {"type": "pong", "message": "Café"}))
+
+    assert websocket.sent == ['{"type":"pong","message":"Café"}']
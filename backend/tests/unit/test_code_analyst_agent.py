@@ -9,20 +9,28 @@ from pathlib import Path
 from src.agents.code_analyst_agent import CodeAnalystAgent
 
 
+@pytest.fixture(scope="class")
+def code_analyst(_session_mock_llm_provider, _session_rate_limiter, tmp_path_factory):
+    """One CodeAnalystAgent shared by the test class"""
+    from src.utils.file_manager import FileManager
+    return CodeAnalystAgent(
+        llm_provider=_session_mock_llm_provider,
+        rate_limiter=_session_rate_limiter,
+        file_manager=FileManager(base_dir=str(tmp_path_factory.mktemp("code_analyst")))
+    )
+
+
 @pytest.mark.unit
 class TestCodeAnalystAgent:
     """Test CodeAnalystAgent class"""
     
-    def test_agent_initialization(self, mock_llm_provider, file_manager):
+    def test_agent_initialization(self, code_analyst):
         """Test agent initialization"""
-        agent = CodeAnalystAgent(
-            provider_name="gemini",
-            file_manager=file_manager
-        )
+        agent = code_analyst
         
         assert agent.file_manager is not None
     
-    def test_analyze_codebase_simple_class(self, mock_llm_provider, file_manager, temp_dir):
+    def test_analyze_codebase_simple_class(self, code_analyst, temp_dir):
         """Test analyzing a codebase with a simple class"""
         # Create a temporary Python file with a class
         test_file = temp_dir / "test_module.py"
@@ -42,10 +50,7 @@ def test_function():
     return "test"
 """)
         
-        agent = CodeAnalystAgent(
-            provider_name="gemini",
-            file_manager=file_manager
-        )
+        agent = code_analyst
         
         # Analyze the codebase
         analysis = agent.analyze_codebase(str(temp_dir))
@@ -66,7 +71,7 @@ def test_function():
         function_names = [func["name"] for func in analysis["functions"]]
         assert "test_function" in function_names
     
-    def test_analyze_codebase_with_docstrings(self, mock_llm_provider, file_manager, temp_dir):
+    def test_analyze_codebase_with_docstrings(self, code_analyst, temp_dir):
         """Test that docstrings are extracted correctly"""
         # Create a Python file with docstrings
         test_file = temp_dir / "documented_module.py"
@@ -85,10 +90,7 @@ def documented_function():
     pass
 """)
         
-        agent = CodeAnalystAgent(
-            provider_name="gemini",
-            file_manager=file_manager
-        )
+        agent = code_analyst
         
         analysis = agent.analyze_codebase(str(temp_dir))
         
@@ -108,7 +110,7 @@ def documented_function():
         func = analysis["functions"][0]
         assert func["docstring"] == "Function docstring"
     
-    def test_analyze_codebase_with_methods(self, mock_llm_provider, file_manager, temp_dir):
+    def test_analyze_codebase_with_methods(self, code_analyst, temp_dir):
         """Test that class methods are extracted correctly"""
         # Create a Python file with a class containing multiple methods
         test_file = temp_dir / "methods_module.py"
@@ -132,10 +134,7 @@ class Calculator:
         return x * y
 """)
         
-        agent = CodeAnalystAgent(
-            provider_name="gemini",
-            file_manager=file_manager
-        )
+        agent = code_analyst
         
         analysis = agent.analyze_codebase(str(temp_dir))
         
@@ -156,7 +155,7 @@ class Calculator:
         assert "x" in add_method["args"]
         assert "y" in add_method["args"]
     
-    def test_analyze_codebase_with_inheritance(self, mock_llm_provider, file_manager, temp_dir):
+    def test_analyze_codebase_with_inheritance(self, code_analyst, temp_dir):
         """Test that class inheritance is detected"""
         # Create a Python file with inheritance
         test_file = temp_dir / "inheritance_module.py"
@@ -170,10 +169,7 @@ class DerivedClass(BaseClass):
     pass
 """)
         
-        agent = CodeAnalystAgent(
-            provider_name="gemini",
-            file_manager=file_manager
-        )
+        agent = code_analyst
         
         analysis = agent.analyze_codebase(str(temp_dir))
         
@@ -181,7 +177,7 @@ class DerivedClass(BaseClass):
         derived_class = next(cls for cls in analysis["classes"] if cls["name"] == "DerivedClass")
         assert "BaseClass" in derived_class["bases"]
     
-    def test_analyze_codebase_skips_test_files(self, mock_llm_provider, file_manager, temp_dir):
+    def test_analyze_codebase_skips_test_files(self, code_analyst, temp_dir):
         """Test that test files are skipped"""
         # Create a test file
         test_file = temp_dir / "test_module.py"
@@ -190,10 +186,7 @@ class TestClass:
     pass
 """)
         
-        agent = CodeAnalystAgent(
-            provider_name="gemini",
-            file_manager=file_manager
-        )
+        agent = code_analyst
         
         analysis = agent.analyze_codebase(str(temp_dir))
         
@@ -202,7 +195,7 @@ class TestClass:
         # TestClass should not be in the analysis
         # For now, we'll just verify the analysis doesn't crash
     
-    def test_analyze_codebase_handles_syntax_errors(self, mock_llm_provider, file_manager, temp_dir):
+    def test_analyze_codebase_handles_syntax_errors(self, code_analyst, temp_dir):
         """Test that syntax errors are handled gracefully"""
         # Create a Python file with a syntax error
         test_file = temp_dir / "syntax_error.py"
@@ -212,10 +205,7 @@ class BrokenClass:
         # Missing closing parenthesis
 """)
         
-        agent = CodeAnalystAgent(
-            provider_name="gemini",
-            file_manager=file_manager
-        )
+        agent = code_analyst
         
         # Should not raise an exception, but should log a warning
         analysis = agent.analyze_codebase(str(temp_dir))
@@ -225,22 +215,16 @@ class BrokenClass:
         assert "classes" in analysis
         assert "functions" in analysis
     
-    def test_analyze_codebase_nonexistent_path(self, mock_llm_provider, file_manager):
+    def test_analyze_codebase_nonexistent_path(self, code_analyst):
         """Test that analyzing a nonexistent path raises an error"""
-        agent = CodeAnalystAgent(
-            provider_name="gemini",
-            file_manager=file_manager
-        )
+        agent = code_analyst
         
         with pytest.raises(ValueError, match="Codebase path does not exist"):
             agent.analyze_codebase("nonexistent/path")
     
-    def test_generate_code_documentation(self, mock_llm_provider, file_manager):
+    def test_generate_code_documentation(self, code_analyst):
         """Test generating documentation from code analysis"""
-        agent = CodeAnalystAgent(
-            provider_name="gemini",
-            file_manager=file_manager
-        )
+        agent = code_analyst
         
         # Create a sample code analysis
         code_analysis = {
@@ -303,12 +287,9 @@ class BrokenClass:
         # The mock LLM should return a test document
         assert "Test Document" in documentation or "test" in documentation.lower()
     
-    def test_generate_code_documentation_with_existing_docs(self, mock_llm_provider, file_manager):
+    def test_generate_code_documentation_with_existing_docs(self, code_analyst):
         """Test generating documentation with existing docs"""
-        agent = CodeAnalystAgent(
-            provider_name="gemini",
-            file_manager=file_manager
-        )
+        agent = code_analyst
         
         code_analysis = {
             "modules": [],
@@ -2,7 +2,13 @@
 Unit Tests: ContextManager
 Fast, isolated tests for context management
 """
+import threading
+import time
+from unittest.mock import Mock
+
+import psycopg2
 import pytest
+from psycopg2 import pool
 from src.context.context_manager import ContextManager
 from src.context.shared_context import (
     RequirementsDocument,
@@ -17,6 +23,104 @@ from datetime import datetime
 class TestContextManager:
     """Test ContextManager class"""
     
+    def test_json_column_accepts_jsonb_and_text(self):
+        """Test that JSON columns are returned parsed whether stored as JSONB or TEXT"""
+        assert ContextManager._json_column({"files": {}}, {}) == {"files": {}}
+        assert ContextManager._json_column('["requirements"]', []) == ["requirements"]
+        assert ContextManager._json_column(None, []) == []
+        assert ContextManager._json_column("", {}) == {}
+    
+    def test_iter_document_content_bytes_keeps_characters_whole(self):
+        """Test that chunks split on characters, so each chunk is valid UTF-8"""
+        chunks = list(ContextManager.iter_document_content_bytes("# Café menu", chunk_size=6))
+        
+        assert [chunk.decode("utf-8") for chunk in chunks] == ["# Café", " menu"]
+    
+    @pytest.fixture
+    def pooled_manager(self, monkeypatch):
+        """A ContextManager on a real ThreadedConnectionPool of stand-in connections"""
+        monkeypatch.setattr(psycopg2, "connect", lambda *args, **kwargs: Mock(closed=False))
+        monkeypatch.setattr(ContextManager, "_initialize_database", lambda self: None)
+        return lambda **kwargs: ContextManager("postgresql://localhost/test", **kwargs)
+    
+    def test_callers_beyond_max_conn_wait_for_a_connection(self, pooled_manager):
+        """Test that more concurrent callers than pooled connections wait instead of failing"""
+        cm = pooled_manager(max_conn=2)
+        in_use, peak, errors = [0], [0], []
+        counter_lock = threading.Lock()
+        
+        def read():
+            try:
+                conn = cm._get_connection()
+                with counter_lock:
+                    in_use[0] += 1
+                    peak[0] = max(peak[0], in_use[0])
+                time.sleep(0.02)
+                with counter_lock:
+                    in_use[0] -= 1
+                cm._put_connection(conn)
+            except Exception as e:
+                errors.append(e)
+        
+        threads = [threading.Thread(target=read) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        assert errors == []
+        assert peak[0] == 2
+    
+    def test_exhausted_pool_fails_after_timeout(self, pooled_manager):
+        """Test that a caller gives up with PoolError once pool_timeout passes"""
+        cm = pooled_manager(max_conn=1, pool_timeout=0.05)
+        held = cm._get_connection()
+        
+        with pytest.raises(pool.PoolError):
+            cm._get_connection()
+        
+        cm._put_connection(held)
+        cm._put_connection(cm._get_connection())
+    
+    @pytest.mark.parametrize("method", ["approve_phase1", "reject_phase1"])
+    def test_phase1_decision_invalidates_cached_responses(self, method, monkeypatch):
+        """Test that approving or rejecting Phase 1 drops the cached status and documents bodies"""
+        from src.context import context_manager as module
+        invalidated = []
+        monkeypatch.setattr(module, "invalidate_project_responses", invalidated.append)
+        conn = Mock()
+        cm = ContextManager.__new__(ContextManager)
+        cm._lock = threading.Lock()
+        cm._get_connection = lambda: conn
+        cm._put_connection = lambda connection: None
+        
+        assert getattr(cm, method)("project_20240101_120000_abcdef12", notes="Reviewed")
+        
+        conn.commit.assert_called_once()
+        assert invalidated == ["project_20240101_120000_abcdef12"]
+
+    def test_new_status_writes_project_files(self, monkeypatch):
+        """Test that creating a status row without results still resets its project_files rows"""
+        from src.context import context_manager as module
+        monkeypatch.setattr(module, "invalidate_project_responses", lambda project_id: None)
+        conn = Mock()
+        conn.cursor.return_value.fetchone.return_value = None
+        cm = ContextManager.__new__(ContextManager)
+        cm._lock = threading.Lock()
+        cm._get_connection = lambda: conn
+        cm._put_connection = lambda connection: None
+        replaced = []
+        cm._replace_project_files = lambda cursor, project_id, files: replaced.append((project_id, files))
+
+        cm.update_project_status(
+            "project_20240101_120000_abcdef12",
+            "started",
+            user_idea="Build a blog",
+        )
+
+        assert replaced == [("project_20240101_120000_abcdef12", {})]
+        conn.commit.assert_called_once()
+
     def test_create_project(self, context_manager):
         """Test creating a project"""
         project_id = context_manager.create_project("test_001", "Test idea")
@@ -67,6 +171,122 @@ class TestContextManager:
         assert retrieved.content == "# Requirements"
         assert retrieved.status == DocumentStatus.COMPLETE
     
+    def test_get_agent_outputs_bulk(self, context_manager, test_project_id):
+        """Test fetching the latest content of several documents at once"""
+        context_manager.create_project(test_project_id, "Test")
+        for document_type, content in [("requirements", "# v1"), ("requirements", "# v2"), ("custom_doc", "# Custom")]:
+            context_manager.save_agent_output(test_project_id, AgentOutput(
+                agent_type=AgentType.TECHNICAL_DOCUMENTATION,
+                document_type=document_type,
+                content=content,
+                file_path=None,
+                status=DocumentStatus.COMPLETE,
+                generated_at=datetime.now()
+            ))
+        
+        contents = context_manager.get_agent_outputs_bulk(
+            test_project_id, ["requirements", "custom_doc", "missing_doc"]
+        )
+        
+        assert contents == {"requirements": "# v2", "custom_doc": "# Custom"}
+    
+    def test_iter_document_content_bytes(self, context_manager, test_project_id):
+        """Test streaming document content in chunks"""
+        context_manager.create_project(test_project_id, "Test")
+        context_manager.save_agent_output(test_project_id, AgentOutput(
+            agent_type=AgentType.TECHNICAL_DOCUMENTATION,
+            document_type="custom_doc",
+            content="# Café menu",
+            file_path=None,
+            status=DocumentStatus.COMPLETE,
+            generated_at=datetime.now()
+        ))
+        
+        context_manager.update_project_status(test_project_id, "complete", user_idea="Test")
+        
+        assert context_manager.get_document_for_download(test_project_id, "missing_doc") == {"content": None}
+        output = context_manager.get_document_for_download(test_project_id, "custom_doc")
+        chunks = list(context_manager.iter_document_content_bytes(output["content"], chunk_size=4))
+        assert len(chunks) == 3
+        assert b"".join(chunks).decode("utf-8") == "# Café menu"
+    
+    def test_get_documents_for_project_with_content(self, context_manager, test_project_id):
+        """Test that missing document content is filled from agent_outputs"""
+        context_manager.create_project(test_project_id, "Test")
+        context_manager.save_agent_output(test_project_id, AgentOutput(
+            agent_type=AgentType.TECHNICAL_DOCUMENTATION,
+            document_type="custom_doc",
+            content="# Custom",
+            file_path=None,
+            status=DocumentStatus.COMPLETE,
+            generated_at=datetime.now()
+        ))
+        context_manager.update_project_status(
+            test_project_id,
+            "complete",
+            user_idea="Test",
+            results={"documents": [{"id": "custom_doc"}, {"id": "inline_doc", "content": "# Inline"}]},
+        )
+        
+        documents = context_manager.get_documents_for_project(test_project_id, include_content=True)
+        
+        assert documents["custom_doc"]["content"] == "# Custom"
+        assert documents["inline_doc"]["content"] == "# Inline"
+
+    def test_get_project_documents_page(self, context_manager, test_project_id):
+        """Test paging a project's files in the database"""
+        context_manager.create_project(test_project_id, "Test")
+        context_manager.save_agent_output(test_project_id, AgentOutput(
+            agent_type=AgentType.TECHNICAL_DOCUMENTATION,
+            document_type="custom_doc",
+            content="# Custom",
+            file_path=None,
+            status=DocumentStatus.COMPLETE,
+            generated_at=datetime.now()
+        ))
+        context_manager.update_project_status(
+            test_project_id,
+            "complete",
+            user_idea="Test",
+            completed_agents=["custom_doc"],
+            results={"files": {"requirements": {"path": "docs/requirements.md"}, "custom_doc": "docs/custom_doc.md"}},
+        )
+
+        page = context_manager.get_project_documents_page(test_project_id, limit=1, offset=1, include_content=True)
+
+        assert page["files"] == [{
+            "doc_id": "custom_doc",
+            "position": 1,
+            "file_path": "docs/custom_doc.md",
+            "completed": True,
+            "content": "# Custom",
+        }]
+        assert context_manager.get_project_documents_page(test_project_id, limit=1, offset=2)["files"] == []
+        after_first = context_manager.get_project_documents_page(test_project_id, limit=5, after_position=0)
+        assert [row["doc_id"] for row in after_first["files"]] == ["custom_doc"]
+        assert context_manager.get_project_documents_page("missing_project", limit=1, offset=0) is None
+
+    def test_get_project_status_lite(self, context_manager, test_project_id):
+        """Test reading the status fields without the results JSON"""
+        context_manager.create_project(test_project_id, "Test")
+        context_manager.update_project_status(
+            test_project_id,
+            "in_progress",
+            user_idea="Test",
+            completed_agents=["requirements"],
+            results={"files": {"requirements": "docs/requirements.md"}},
+            selected_documents=["requirements", "api_documentation"],
+        )
+
+        status = context_manager.get_project_status_lite(test_project_id)
+
+        assert status["status"] == "in_progress"
+        assert status["completed_agents"] == ["requirements"]
+        assert status["selected_documents"] == ["requirements", "api_documentation"]
+        assert status["updated_at"] is not None
+        assert "results" not in status
+        assert context_manager.get_project_status_lite("missing_project") is None
+
     def test_get_shared_context(self, context_manager, test_project_id):
         """Test getting complete shared context"""
         context_manager.create_project(test_project_id, "Test idea")
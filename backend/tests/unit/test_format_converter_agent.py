@@ -2,11 +2,29 @@
 Unit Tests: FormatConverterAgent
 Fast, isolated tests for format converter agent
 """
+import os
 import pytest
 from pathlib import Path
 from src.agents.format_converter_agent import FormatConverterAgent
 
 
+@pytest.fixture(scope="module")
+def format_agent(_session_mock_llm_provider, tmp_path_factory):
+    """One FormatConverterAgent (and its output directory) shared by the module"""
+    from src.utils.file_manager import FileManager
+    file_manager = FileManager(base_dir=str(tmp_path_factory.mktemp("format_converter")))
+    return FormatConverterAgent(
+        llm_provider=_session_mock_llm_provider,
+        file_manager=file_manager
+    )
+
+
+@pytest.fixture(scope="module")
+def sample_html(format_agent):
+    """HTML rendered once from a small Markdown document"""
+    return format_agent.markdown_to_html("# Test Title\n\nThis is a paragraph with **bold** text.")
+
+
 @pytest.mark.unit
 class TestFormatConverterAgent:
     """Test FormatConverterAgent class"""
@@ -22,13 +40,9 @@ class TestFormatConverterAgent:
         assert agent.file_manager is not None
         assert "html" in agent.supported_formats
     
-    def test_markdown_to_html(self, mock_llm_provider, file_manager):
+    def test_markdown_to_html(self, format_agent):
         """Test Markdown to HTML conversion"""
-        agent = FormatConverterAgent(
-            llm_provider=mock_llm_provider,
-            file_manager=file_manager
-        )
-        
+        agent = format_agent
         markdown = "# Test Title\n\nThis is a paragraph."
         html = agent.markdown_to_html(markdown)
         
@@ -36,35 +50,26 @@ class TestFormatConverterAgent:
         assert len(html) > 0
         assert "<html>" in html.lower() or "<h1>" in html.lower()
     
-    def test_convert_html(self, mock_llm_provider, file_manager):
+    def test_convert_html(self, format_agent):
         """Test converting to HTML format"""
-        agent = FormatConverterAgent(
-            llm_provider=mock_llm_provider,
-            file_manager=file_manager
-        )
+        agent = format_agent
         
         markdown = "# Test Document\n\nContent here."
         file_path = agent.convert(markdown, "html", "test.html")
         
         assert file_path is not None
-        assert file_manager.file_exists("test.html")
+        assert agent.file_manager.file_exists("test.html")
     
-    def test_convert_unsupported_format(self, mock_llm_provider, file_manager):
+    def test_convert_unsupported_format(self, format_agent):
         """Test error on unsupported format"""
-        agent = FormatConverterAgent(
-            llm_provider=mock_llm_provider,
-            file_manager=file_manager
-        )
+        agent = format_agent
         
         with pytest.raises(ValueError, match="Unsupported format"):
             agent.convert("# Test", "xyz", "test.xyz")
     
-    def test_convert_all_documents(self, mock_llm_provider, file_manager):
+    def test_convert_all_documents(self, format_agent):
         """Test converting multiple documents"""
-        agent = FormatConverterAgent(
-            llm_provider=mock_llm_provider,
-            file_manager=file_manager
-        )
+        agent = format_agent
         
         documents = {
             "doc1.md": "# Document 1\n\nContent 1",
@@ -77,30 +82,18 @@ class TestFormatConverterAgent:
         assert "doc1.md" in results
         assert "doc2.md" in results
     
-    def test_markdown_to_pdf(self, mock_llm_provider, file_manager):
+    def test_markdown_to_pdf(self, format_agent, sample_html):
         """Test Markdown to PDF conversion"""
-        agent = FormatConverterAgent(
-            llm_provider=mock_llm_provider,
-            file_manager=file_manager
-        )
-        
-        markdown = "# Test Title\n\nThis is a paragraph with **bold** text."
-        html = agent.markdown_to_html(markdown)
-        
         try:
-            pdf_path = agent.html_to_pdf(html, "test.pdf")
+            pdf_path = format_agent.html_to_pdf(sample_html, "test.pdf")
             assert Path(pdf_path).exists()
         except (ImportError, OSError):
             # OSError can occur on macOS if system libraries aren't installed
             pytest.skip("PDF libraries not available (may need system libraries on macOS)")
     
-    def test_markdown_to_docx(self, mock_llm_provider, file_manager):
+    def test_markdown_to_docx(self, format_agent):
         """Test Markdown to DOCX conversion"""
-        agent = FormatConverterAgent(
-            llm_provider=mock_llm_provider,
-            file_manager=file_manager
-        )
-        
+        agent = format_agent
         markdown = "# Test Title\n\nThis is a paragraph.\n\n## Section\n\n- Item 1\n- Item 2"
         
         try:
@@ -109,30 +102,24 @@ class TestFormatConverterAgent:
         except ImportError:
             pytest.skip("DOCX library not installed")
     
-    def test_convert_multiple_formats(self, mock_llm_provider, file_manager):
+    def test_convert_multiple_formats(self, format_agent):
         """Test converting to multiple formats"""
-        agent = FormatConverterAgent(
-            llm_provider=mock_llm_provider,
-            file_manager=file_manager
-        )
+        agent = format_agent
         
         markdown = "# Test Document\n\nContent here."
         
-        try:
-            html_path = agent.convert(markdown, "html", "test.html")
-            assert Path(html_path).exists()
-        except Exception:
-            pass  # HTML should always work
+        # HTML is not written to disk; only a virtual path is returned
+        assert agent.convert(markdown, "html", "test.html") == "docs/test.html"
         
-        try:
-            pdf_path = agent.convert(markdown, "pdf", "test.pdf")
-            assert Path(pdf_path).exists()
-        except (ImportError, Exception):
-            pass  # PDF might not be available
+        written = []
+        for output_format, filename in (("pdf", "test.pdf"), ("docx", "test.docx")):
+            try:
+                written.append(Path(agent.convert(markdown, output_format, filename)).name)
+            except (ImportError, OSError):
+                pass  # PDF/DOCX libraries might not be available
         
-        try:
-            docx_path = agent.convert(markdown, "docx", "test.docx")
-            assert Path(docx_path).exists()
-        except (ImportError, Exception):
-            pass  # DOCX might not be available
+        # One directory scan covers every written file
+        with os.scandir(agent.file_manager.base_dir) as entries:
+            on_disk = {entry.name for entry in entries}
+        assert set(written) <= on_disk
 
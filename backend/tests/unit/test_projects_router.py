@@ -0,0 +1,296 @@
+"""
+Unit Tests: Projects router
+Exercises the project endpoints against an in-memory context manager
+"""
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.web.app import app
+from src.web.dependencies import get_context_manager
+from src.web.routers import projects
+from src.web.utils import is_valid_project_id
+from tests.fakes import FakeContextManager
+
+PROJECT_ID = "project_20240101_120000_abcdef12"
+
+
+@pytest.fixture
+def fake_cm():
+    cm = FakeContextManager()
+    cm.statuses[PROJECT_ID] = {
+        "project_id": PROJECT_ID,
+        "status": "complete",
+        "completed_agents": ["requirements"],
+        "selected_documents": ["requirements", "custom_doc"],
+        "error": None,
+        "updated_at": "2024-01-01T12:00:00",
+        "results": {
+            "files": {
+                "requirements": {"path": "docs/requirements.md"},
+                "custom_doc": "docs/custom_doc.md",
+            }
+        },
+    }
+    cm.contents[(PROJECT_ID, "requirements")] = "# Requirements"
+    cm.contents[(PROJECT_ID, "custom_doc")] = "# Custom"
+    return cm
+
+
+@pytest.fixture
+def response_cache(monkeypatch):
+    """Replace the Redis response cache with a dictionary"""
+    cache = {}
+    monkeypatch.setattr(projects, "get_cached_project_response", lambda pid, field: cache.get((pid, field)))
+    monkeypatch.setattr(
+        projects, "set_cached_project_response", lambda pid, field, body: cache.__setitem__((pid, field), body)
+    )
+    return cache
+
+
+@pytest.fixture
+def client(fake_cm, response_cache):
+    app.dependency_overrides[get_context_manager] = lambda: fake_cm
+    yield TestClient(app)
+    app.dependency_overrides.pop(get_context_manager, None)
+
+
+@pytest.fixture
+def submitted(monkeypatch):
+    """Route generation through the BackgroundTasks fallback and record submissions"""
+    calls = []
+    monkeypatch.setattr(projects, "REDIS_AVAILABLE", False)
+    monkeypatch.setattr(projects, "check_redis_available", lambda: False)
+    monkeypatch.setattr(projects, "run_document_generation_sync", lambda **kwargs: calls.append(kwargs))
+    return calls
+
+
+@pytest.mark.unit
+class TestProjectsRouter:
+    """Test project read endpoints"""
+
+    def test_create_project_deduplicates_documents(self, client, fake_cm, submitted):
+        response = client.post(
+            "/api/projects",
+            json={"user_idea": "A todo app", "selected_documents": ["requirements", "api_documentation", "requirements"]},
+        )
+
+        assert response.status_code == 202
+        project_id = response.json()["project_id"]
+        assert is_valid_project_id(project_id)
+        assert fake_cm.statuses[project_id]["selected_documents"] == ["requirements", "api_documentation"]
+        assert submitted[0]["selected_documents"] == ["requirements", "api_documentation"]
+
+    def test_create_project_rejects_oversized_document_list(self, client, submitted):
+        response = client.post(
+            "/api/projects",
+            json={"user_idea": "A todo app", "selected_documents": [f"doc_{i}" for i in range(101)]},
+        )
+
+        assert response.status_code == 422
+        assert submitted == []
+
+    def test_create_project_submits_on_pooled_producer(self, client, monkeypatch):
+        producer = object()
+        submissions = []
+
+        class FakeProducerPool:
+            @contextmanager
+            def acquire(self, block=False):
+                yield producer
+
+        class FakeTask:
+            def apply_async(self, kwargs, producer):
+                submissions.append((kwargs, producer))
+                return SimpleNamespace(id="task-1")
+
+        monkeypatch.setattr(projects, "REDIS_AVAILABLE", True)
+        monkeypatch.setattr(projects, "CELERY_TASK_AVAILABLE", True)
+        monkeypatch.setattr(projects, "celery_app", SimpleNamespace(producer_pool=FakeProducerPool()))
+        monkeypatch.setattr(projects, "generate_documents_task", FakeTask())
+
+        response = client.post("/api/projects", json={"user_idea": "A todo app", "selected_documents": ["requirements"]})
+
+        assert response.status_code == 202
+        assert len(submissions) == 1
+        kwargs, used_producer = submissions[0]
+        assert used_producer is producer
+        assert kwargs["selected_documents"] == ["requirements"]
+
+    def test_create_brick_and_mortar_project(self, client, fake_cm, submitted):
+        response = client.post("/api/projects/brick-and-mortar", json={"user_idea": "A neighbourhood bakery"})
+
+        assert response.status_code == 202
+        project_id = response.json()["project_id"]
+        assert fake_cm.statuses[project_id]["selected_documents"] == projects.BRICK_AND_MORTAR_DOCUMENTS
+        assert len(submitted) == 1
+
+    def test_get_project_status(self, client):
+        response = client.get(f"/api/projects/{PROJECT_ID}/status")
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["project_id"] == PROJECT_ID
+        assert data["status"] == "complete"
+        assert data["completed_documents"] == ["requirements"]
+        assert data["selected_documents"] == ["requirements", "custom_doc"]
+
+    def test_get_project_status_not_found(self, client):
+        response = client.get("/api/projects/project_20240101_120000_00000000/status")
+        assert response.status_code == 404
+
+    def test_get_project_status_invalid_id(self, client, fake_cm):
+        response = client.get("/api/projects/project_nonexistent/status")
+        assert response.status_code == 400
+
+    def test_get_project_status_cached(self, client, fake_cm, response_cache):
+        first = client.get(f"/api/projects/{PROJECT_ID}/status")
+        fake_cm.statuses[PROJECT_ID]["status"] = "failed"
+        second = client.get(f"/api/projects/{PROJECT_ID}/status")
+
+        assert (PROJECT_ID, "status@2024-01-01T12:00:00") in response_cache
+        assert second.json() == first.json()
+        assert second.json()["status"] == "complete"
+
+    def test_get_project_status_cache_follows_writes(self, client, fake_cm, response_cache):
+        client.get(f"/api/projects/{PROJECT_ID}/status")
+        fake_cm.update_project_status(PROJECT_ID, status="failed")
+        response = client.get(f"/api/projects/{PROJECT_ID}/status")
+
+        assert response.json()["status"] == "failed"
+
+    def test_get_project_status_not_modified(self, client, fake_cm, response_cache):
+        first = client.get(f"/api/projects/{PROJECT_ID}/status")
+        etag = first.headers["etag"]
+
+        # An unchanged project is answered before the status row or the cache is read
+        response_cache.clear()
+        fake_cm.get_project_status_lite = None
+        fresh = client.get(f"/api/projects/{PROJECT_ID}/status", headers={"If-None-Match": etag})
+        weak = client.get(f"/api/projects/{PROJECT_ID}/status", headers={"If-None-Match": f'W/{etag}'})
+
+        assert fresh.status_code == 304
+        assert weak.status_code == 304
+        assert fresh.content == b""
+        assert weak.headers["etag"] == etag
+        assert response_cache == {}
+
+    def test_get_project_documents_not_modified(self, client, fake_cm):
+        first = client.get(f"/api/projects/{PROJECT_ID}/documents?page_size=1")
+        second = client.get(
+            f"/api/projects/{PROJECT_ID}/documents?page_size=1", headers={"If-None-Match": first.headers["etag"]}
+        )
+        other_page = client.get(
+            f"/api/projects/{PROJECT_ID}/documents?page=2&page_size=1", headers={"If-None-Match": first.headers["etag"]}
+        )
+
+        assert second.status_code == 304
+        assert other_page.status_code == 200
+        assert fake_cm.page_queries == [(1, 0, False), (1, 1, False)]
+
+    def test_get_project_documents_etag_changes(self, client, fake_cm, response_cache):
+        first = client.get(f"/api/projects/{PROJECT_ID}/documents")
+        fake_cm.statuses[PROJECT_ID]["completed_agents"].append("custom_doc")
+        fake_cm.touch(PROJECT_ID)
+        second = client.get(f"/api/projects/{PROJECT_ID}/documents", headers={"If-None-Match": first.headers["etag"]})
+
+        assert second.status_code == 200
+        assert second.headers["etag"] != first.headers["etag"]
+        assert {doc["id"]: doc["status"] for doc in second.json()["documents"]}["custom_doc"] == "complete"
+
+    def test_get_project_documents_cached_per_page(self, client, fake_cm, response_cache):
+        client.get(f"/api/projects/{PROJECT_ID}/documents?page=1&page_size=1")
+        client.get(f"/api/projects/{PROJECT_ID}/documents?page=1&page_size=1")
+        client.get(f"/api/projects/{PROJECT_ID}/documents?page=2&page_size=1&include_content=true")
+
+        assert set(response_cache) == {
+            (PROJECT_ID, "documents:1:1:0@2024-01-01T12:00:00"),
+            (PROJECT_ID, "documents:2:1:1@2024-01-01T12:00:00"),
+        }
+        assert fake_cm.page_queries == [(1, 0, False), (1, 1, True)]
+
+    def test_get_project_documents(self, client):
+        response = client.get(f"/api/projects/{PROJECT_ID}/documents?include_content=true")
+
+        assert response.status_code == 200
+        documents = {doc["id"]: doc for doc in response.json()["documents"]}
+        assert documents["requirements"]["status"] == "complete"
+        assert documents["requirements"]["file_path"] == "docs/requirements.md"
+        assert documents["requirements"]["content"] == "# Requirements"
+        assert documents["custom_doc"]["status"] == "pending"
+        assert documents["custom_doc"]["name"] == "Custom Doc"
+
+    def test_get_project_documents_without_content(self, client, fake_cm):
+        response = client.get(f"/api/projects/{PROJECT_ID}/documents")
+
+        assert response.status_code == 200
+        documents = response.json()["documents"]
+        assert len(documents) == 2
+        assert all(doc["content"] is None for doc in documents)
+        assert fake_cm.page_queries == [(50, 0, False)]
+
+    def test_get_project_documents_pagination(self, client, fake_cm):
+        response = client.get(f"/api/projects/{PROJECT_ID}/documents?page=2&page_size=1&include_content=true")
+
+        assert response.status_code == 200
+        documents = response.json()["documents"]
+        assert [doc["id"] for doc in documents] == ["custom_doc"]
+        # The database pages the documents, in one query
+        assert fake_cm.page_queries == [(1, 1, True)]
+
+    def test_get_project_documents_cursor(self, client):
+        first = client.get(f"/api/projects/{PROJECT_ID}/documents?page_size=1").json()
+        assert [doc["id"] for doc in first["documents"]] == ["requirements"]
+        assert first["next_cursor"]
+
+        second = client.get(f"/api/projects/{PROJECT_ID}/documents?page_size=1&cursor={first['next_cursor']}").json()
+        assert [doc["id"] for doc in second["documents"]] == ["custom_doc"]
+
+        third = client.get(f"/api/projects/{PROJECT_ID}/documents?page_size=1&cursor={second['next_cursor']}").json()
+        assert third["documents"] == []
+        assert third["next_cursor"] is None
+
+    def test_get_project_documents_invalid_cursor(self, client):
+        response = client.get(f"/api/projects/{PROJECT_ID}/documents?cursor=not-a-cursor")
+        assert response.status_code == 400
+
+    def test_get_project_documents_not_found(self, client):
+        response = client.get("/api/projects/project_20240101_120000_00000000/documents")
+        assert response.status_code == 404
+
+    def test_get_project_documents_page_out_of_range(self, client):
+        response = client.get(f"/api/projects/{PROJECT_ID}/documents?page=3&page_size=1")
+
+        assert response.status_code == 200
+        assert response.json()["documents"] == []
+
+    def test_get_single_document(self, client):
+        response = client.get(f"/api/projects/{PROJECT_ID}/documents/custom_doc")
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["id"] == "custom_doc"
+        assert data["content"] == "# Custom"
+
+    def test_get_single_document_not_generated(self, client):
+        response = client.get(f"/api/projects/{PROJECT_ID}/documents/missing_doc")
+        assert response.status_code == 404
+
+    def test_download_document(self, client):
+        response = client.get(f"/api/projects/{PROJECT_ID}/documents/custom_doc/download")
+
+        assert response.status_code == 200
+        assert "text/markdown" in response.headers["content-type"]
+        assert 'filename="custom_doc.md"' in response.headers["content-disposition"]
+        assert response.text == "# Custom"
+
+    def test_download_document_not_found(self, client):
+        response = client.get(f"/api/projects/{PROJECT_ID}/documents/missing_doc/download")
+        assert response.status_code == 404
+
+    def test_download_document_project_not_found(self, client):
+        response = client.get("/api/projects/project_20240101_120000_00000000/documents/custom_doc/download")
+        assert response.status_code == 404
+        assert response.json()["detail"] == "Project not found."
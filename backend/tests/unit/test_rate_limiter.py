@@ -3,11 +3,25 @@ Unit Tests: RequestQueue (Rate Limiter)
 Fast, isolated tests for rate limiting
 """
 import pytest
-import time
 from unittest.mock import Mock
 from src.rate_limit.queue_manager import RequestQueue
 
 
+class FakeClock:
+    """Clock whose sleep advances time instantly"""
+    
+    def __init__(self):
+        self.time = 1000.0
+        self.slept = []
+    
+    def now(self):
+        return self.time
+    
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.time += seconds
+
+
 @pytest.mark.unit
 class TestRequestQueue:
     """Test RequestQueue class"""
@@ -38,26 +52,30 @@ class TestRequestQueue:
         
         assert result == "result"
     
-    def test_rate_limit_enforcement(self):
+    def test_rate_limit_enforcement(self, monkeypatch):
         """Test that rate limiting enforces limits"""
+        clock = FakeClock()
         # Use safety_margin=1.0 to disable safety margin for this test
         # so we can test with exact limits
-        queue = RequestQueue(max_rate=2, period=1, safety_margin=1.0)  # Very strict limit
+        queue = RequestQueue(
+            max_rate=2, period=1, safety_margin=1.0,  # Very strict limit
+            time_fn=clock.now, sleep_fn=clock.sleep
+        )
+        # No jitter, so the only wait is the one enforcing the limit
+        monkeypatch.setattr("src.rate_limit.queue_manager.random.uniform", lambda a, b: 0)
         
-        def test_func():
+        def test_func(n):
             return "ok"
         
-        # First two calls should work
-        queue.execute(test_func)
-        queue.execute(test_func)
-        
-        # Third call might need to wait (depending on timing)
-        start = time.time()
-        queue.execute(test_func)
-        duration = time.time() - start
+        # First two calls should work (distinct args so results are not cached)
+        queue.execute(test_func, 1)
+        queue.execute(test_func, 2)
+        assert clock.slept == []
         
-        # Should complete (may wait if limit hit)
-        assert duration >= 0
+        # Third call has to wait for the oldest request to leave the window
+        assert queue.execute(test_func, 3) == "ok"
+        assert len(clock.slept) == 1
+        assert clock.slept[0] == pytest.approx(1.5)
     
     def test_caching(self, rate_limiter):
         """Test that rate limiter caches results"""
@@ -0,0 +1,267 @@
+"""
+Unit Tests: WebSocketManager
+Broadcast and queueing behaviour against in-memory WebSocket stand-ins
+"""
+import asyncio
+import json
+
+import pytest
+
+from src.web.websocket_manager import WebSocketManager
+
+PROJECT_ID = "project_20240101_120000_abcdef12"
+
+
+class FakeWebSocket:
+    """Records frames sent to it; optionally fails or stalls on send"""
+
+    def __init__(self, fail: bool = False, delay: float = 0.0):
+        self.sent = []
+        self.fail = fail
+        self.delay = delay
+        self.closed = False
+
+    async def accept(self):
+        pass
+
+    async def close(self, code=1000, reason=None):
+        if self.fail:
+            raise RuntimeError("connection closed")
+        self.closed = True
+
+    async def send_json(self, data):
+        await self._send(data)
+
+    async def send_text(self, data):
+        await self._send(json.loads(data))
+
+    async def _send(self, data):
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("connection closed")
+        self.sent.append(data)
+
+
+@pytest.fixture
+def manager():
+    return WebSocketManager()
+
+
+async def flush(manager, project_id=PROJECT_ID):
+    """Wait until each connection's writer has sent everything handed to it"""
+    entries = list(manager.active_connections.get(project_id, ()))
+    await asyncio.wait_for(asyncio.gather(*(entry.queue.join() for entry in entries)), 1)
+
+
+def received(client):
+    """Frames a client received after the "connected" frame, without timestamps"""
+    assert client.sent[0]["type"] == "connected"
+    return [{k: v for k, v in frame.items() if k != "timestamp"} for frame in client.sent[1:]]
+
+
+@pytest.mark.unit
+class TestWebSocketManager:
+    """Test local broadcast and queueing"""
+
+    @pytest.mark.asyncio
+    async def test_connect_and_disconnect(self, manager):
+        client = FakeWebSocket()
+        await manager.connect(client, PROJECT_ID)
+        await manager.connect(client, PROJECT_ID)
+        assert manager.get_connection_count(PROJECT_ID) == 1
+
+        manager.disconnect(client, PROJECT_ID)
+        manager.disconnect(client, PROJECT_ID)
+        assert manager.get_connection_count(PROJECT_ID) == 0
+        assert PROJECT_ID not in manager.active_connections
+
+    @pytest.mark.asyncio
+    async def test_broadcast_drops_failed_connections(self, manager):
+        healthy, broken = FakeWebSocket(), FakeWebSocket()
+        await manager.connect(healthy, PROJECT_ID)
+        await manager.connect(broken, PROJECT_ID)
+        broken.fail = True
+
+        await manager.send_progress(PROJECT_ID, {"type": "progress"})
+        await flush(manager)
+
+        assert received(healthy) == [{"type": "progress"}]
+        assert [entry.ws for entry in manager.active_connections[PROJECT_ID]] == [healthy]
+
+        manager.disconnect(healthy, PROJECT_ID)
+        assert PROJECT_ID not in manager._locks
+
+    @pytest.mark.asyncio
+    async def test_lock_kept_while_a_coroutine_waits_for_it(self, manager):
+        release_first = asyncio.Event()
+        seen_after_release = []
+
+        async def first():
+            async with manager._project_lock(PROJECT_ID):
+                await release_first.wait()
+            # Released, but the woken second user has not taken it yet
+            seen_after_release.append(manager._locks.get(PROJECT_ID))
+
+        async def second():
+            async with manager._project_lock(PROJECT_ID):
+                pass
+
+        first_task = asyncio.create_task(first())
+        await asyncio.sleep(0)
+        lock = manager._locks[PROJECT_ID]
+        second_task = asyncio.create_task(second())
+        await asyncio.sleep(0)
+
+        release_first.set()
+        await asyncio.gather(first_task, second_task)
+
+        assert seen_after_release == [lock]
+        assert PROJECT_ID not in manager._locks
+        assert PROJECT_ID not in manager._lock_users
+
+    @pytest.mark.asyncio
+    async def test_concurrent_connects_respect_limit(self):
+        manager = WebSocketManager(max_connections_per_project=2)
+
+        class SlowAcceptWebSocket(FakeWebSocket):
+            closed = False
+
+            async def accept(self):
+                await asyncio.sleep(0.01)
+
+            async def close(self, code=1000, reason=None):
+                self.closed = True
+
+        clients = [SlowAcceptWebSocket() for _ in range(3)]
+        await asyncio.gather(*(manager.connect(client, PROJECT_ID) for client in clients))
+
+        assert manager.get_connection_count(PROJECT_ID) == 2
+        assert sum(client.closed for client in clients) == 1
+
+    @pytest.mark.asyncio
+    async def test_broadcast_sends_concurrently(self, manager):
+        clients = [FakeWebSocket(delay=0.05) for _ in range(4)]
+        for client in clients:
+            await manager.connect(client, PROJECT_ID)
+
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        await manager.send_progress(PROJECT_ID, {"type": "progress"})
+        # Broadcasting only enqueues; the writers send in the background
+        assert all(received(client) == [] for client in clients)
+        await flush(manager)
+
+        # Sequential sends would take 4 x 50ms
+        assert loop.time() - started < 0.15
+        assert all(received(client) == [{"type": "progress"}] for client in clients)
+
+    @pytest.mark.asyncio
+    async def test_writer_merges_messages_sent_while_busy(self, manager):
+        client = FakeWebSocket(delay=0.02)
+        await manager.connect(client, PROJECT_ID)
+
+        await manager.send_progress(PROJECT_ID, {"n": 1})
+        await asyncio.sleep(0)
+        await manager.send_progress(PROJECT_ID, {"n": 2})
+        await manager.send_progress(PROJECT_ID, {"n": 3})
+        await flush(manager)
+
+        frames = received(client)
+        assert frames[0] == {"n": 1}
+        assert frames[1]["type"] == "replay"
+        assert [message["n"] for message in frames[1]["messages"]] == [2, 3]
+
+    @pytest.mark.asyncio
+    async def test_slow_client_dropped_when_its_queue_is_full(self):
+        manager = WebSocketManager(max_queue_size=1)
+        slow = FakeWebSocket(delay=0.05)
+        await manager.connect(slow, PROJECT_ID)
+
+        await manager.send_progress(PROJECT_ID, {"n": 1})
+        await asyncio.sleep(0)
+        await manager.send_progress(PROJECT_ID, {"n": 2})
+        await manager.send_progress(PROJECT_ID, {"n": 3})
+
+        assert slow.closed
+        assert manager.get_connection_count(PROJECT_ID) == 0
+
+    @pytest.mark.asyncio
+    async def test_messages_queued_until_connect(self, manager):
+        await manager.send_progress(PROJECT_ID, {"type": "status", "n": 1})
+        await manager.send_progress(PROJECT_ID, {"type": "status", "n": 2})
+        assert manager.get_queue_size(PROJECT_ID) == 2
+
+        client = FakeWebSocket()
+        await manager.connect(client, PROJECT_ID)
+        await flush(manager)
+
+        frames = received(client)
+        assert len(frames) == 1
+        assert frames[0]["type"] == "replay"
+        assert [message["n"] for message in frames[0]["messages"]] == [1, 2]
+        assert manager.get_queue_size(PROJECT_ID) == 0
+
+    @pytest.mark.asyncio
+    async def test_connected_frame_precedes_replay(self, manager):
+        await manager.send_progress(PROJECT_ID, {"type": "status", "n": 1})
+        await manager.send_progress(PROJECT_ID, {"type": "status", "n": 2})
+
+        # A slow first send must not let the writer overtake it
+        client = FakeWebSocket(delay=0.02)
+        await manager.connect(client, PROJECT_ID)
+        await flush(manager)
+
+        assert [frame["type"] for frame in client.sent] == ["connected", "replay"]
+        assert client.sent[0]["project_id"] == PROJECT_ID
+
+    @pytest.mark.asyncio
+    async def test_queue_drops_oldest_when_full(self):
+        manager = WebSocketManager(max_queue_size=2)
+        for n in range(3):
+            await manager.send_progress(PROJECT_ID, {"n": n})
+
+        client = FakeWebSocket()
+        await manager.connect(client, PROJECT_ID)
+        await flush(manager)
+
+        assert [message["n"] for message in received(client)[0]["messages"]] == [1, 2]
+
+    @pytest.mark.asyncio
+    async def test_broadcast_serializes_once(self, manager, monkeypatch):
+        from src.web import websocket_manager as module
+
+        clients = [FakeWebSocket() for _ in range(3)]
+        for client in clients:
+            await manager.connect(client, PROJECT_ID)
+        dumps_calls = []
+        real_dumps = module.orjson.dumps
+        monkeypatch.setattr(module.orjson, "dumps", lambda obj: dumps_calls.append(obj) or real_dumps(obj))
+
+        await manager.send_progress(PROJECT_ID, {"type": "progress", "name": "Café"})
+        await flush(manager)
+
+        assert len(dumps_calls) == 1
+        assert all(received(client) == [{"type": "progress", "name": "Café"}] for client in clients)
+
+    @pytest.mark.asyncio
+    async def test_send_progress_without_redis_broadcasts_locally(self, manager):
+        client = FakeWebSocket()
+        await manager.connect(client, PROJECT_ID)
+
+        await manager.send_progress(PROJECT_ID, {"type": "document_started", "name": "Café"})
+        await flush(manager)
+
+        assert client.sent[1]["type"] == "document_started"
+        assert client.sent[1]["name"] == "Café"
+        assert "timestamp" in client.sent[1]
+
+
+@pytest.mark.unit
+def test_global_manager_is_created_once_on_access():
+    from src.web import websocket_manager as module
+
+    assert module.websocket_manager is module.websocket_manager
+    assert isinstance(module.websocket_manager, WebSocketManager)
+    with pytest.raises(AttributeError):
+        module.not_a_manager
@@ -29,6 +29,9 @@ def main() -> None:
         reload=True,
         reload_dirs=["backend/src"],
         log_level="info",
+        # WebSocket keepalive via protocol PING/PONG control frames
+        ws_ping_interval=30.0,
+        ws_ping_timeout=10.0,
     )
     server = uvicorn.Server(config)
 
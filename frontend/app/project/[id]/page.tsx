@@ -85,40 +85,44 @@ export default function ProjectStatusPage() {
           if (!isMountedRef.current) return;
           
           try {
-            const data: ProgressEvent = JSON.parse(event.data);
-            logger.websocketEvent('message', projectId, { type: data.type, document_id: data.document_id });
+            const parsed = JSON.parse(event.data);
+            // Messages queued while no client was connected arrive as one replay frame
+            const messages: ProgressEvent[] = parsed.type === 'replay' ? parsed.messages : [parsed];
+            for (const data of messages) {
+              logger.websocketEvent('message', projectId, { type: data.type, document_id: data.document_id });
             
-            // Prevent duplicate events
-            setEvents((prev) => {
-              // Create unique ID for this event
-              const eventId = `${data.type}-${data.document_id || data.project_id || ''}`;
-              const existingIds = new Set(
-                prev.map(e => `${e.type}-${e.document_id || e.project_id || ''}`)
-              );
+              // Prevent duplicate events
+              setEvents((prev) => {
+                // Create unique ID for this event
+                const eventId = `${data.type}-${data.document_id || data.project_id || ''}`;
+                const existingIds = new Set(
+                  prev.map(e => `${e.type}-${e.document_id || e.project_id || ''}`)
+                );
               
-              // Special handling for 'complete' events - only allow one
-              if (data.type === 'complete') {
-                if (prev.some(e => e.type === 'complete')) {
-                  return prev; // Skip duplicate complete events
+                // Special handling for 'complete' events - only allow one
+                if (data.type === 'complete') {
+                  if (prev.some(e => e.type === 'complete')) {
+                    return prev; // Skip duplicate complete events
+                  }
                 }
-              }
               
-              // Skip if event already exists
-              if (existingIds.has(eventId)) {
-                return prev;
-              }
+                // Skip if event already exists
+                if (existingIds.has(eventId)) {
+                  return prev;
+                }
               
-              return [...prev, data];
-            });
+                return [...prev, data];
+              });
 
-            // Navigate to results when complete
-            if (data.type === 'complete') {
-              logger.info('Document generation completed, navigating to results', { projectId });
-              setTimeout(() => {
-                if (isMountedRef.current) {
-                  router.push(`/project/${projectId}/results`);
-                }
-              }, 2000);
+              // Navigate to results when complete
+              if (data.type === 'complete') {
+                logger.info('Document generation completed, navigating to results', { projectId });
+                setTimeout(() => {
+                  if (isMountedRef.current) {
+                    router.push(`/project/${projectId}/results`);
+                  }
+                }, 2000);
+              }
             }
           } catch (err) {
             logger.error('Failed to parse WebSocket message', err, { projectId, message: event.data });
@@ -81,6 +81,7 @@ export interface GeneratedDocument {
 export interface ProjectDocumentsResponse {
   project_id: string;
   documents: GeneratedDocument[];
+  next_cursor?: string | null;
 }
 
 // Type guard for axios errors
@@ -186,10 +187,11 @@ export async function getProjectStatus(
 }
 
 export async function getProjectDocuments(
-  projectId: string
+  projectId: string,
+  includeContent: boolean = true
 ): Promise<ProjectDocumentsResponse> {
   return fetchJSON<ProjectDocumentsResponse>(
-    `/api/projects/${projectId}/documents`
+    `/api/projects/${projectId}/documents?include_content=${includeContent}`
   );
 }
 